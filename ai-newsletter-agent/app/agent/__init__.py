@@ -1,4 +1,11 @@
-# Expose the compiled graph as the main entry point for the module
-from .graph import workflow_app
-
+# Expose the compiled graph as the main entry point for the module.
+# Resolved on first access, so importing `app.agent.nodes` does not build the graph.
 __all__ = ["workflow_app"]
+
+
+def __getattr__(name):
+    if name == "workflow_app":
+        from .graph import workflow_app
+
+        return workflow_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
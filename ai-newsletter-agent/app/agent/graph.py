@@ -1,24 +1,68 @@
-from app.agent.nodes import (editor_writer, monitor_news, scraper_node, summarize_node)
-from app.state import AgentState
-from langgraph.graph import END, StateGraph
+from app.agent.nodes import (
+    company_pipeline,
+    dedup_node,
+    editor_writer,
+    fan_out_companies,
+    monitor_news,
+    scraper_node,
+    summarize_node,
+)
+from app.config import CONFIG
+from app.state import AgentState, CompanyTask
+from langgraph.graph import END, START, StateGraph
 
-# 1. Define the workflow
-workflow = StateGraph(AgentState)
 
-# 2. Add Nodes
-workflow.add_node("monitor", monitor_news)
-workflow.add_node("scraper", scraper_node)
-workflow.add_node("summarizer", summarize_node)
-workflow.add_node("editor", editor_writer)
+def build_workflow(mode: str = "linear", with_editor: bool = True) -> StateGraph:
+    """
+    Builds the (uncompiled) workflow graph.
 
-# 3. Set Entry Point
-workflow.set_entry_point("monitor")
+    - "linear": monitor -> scraper -> dedup -> summarizer -> editor, each stage a barrier.
+    - "fanout": one search -> scrape -> summarize branch per company (LangGraph `Send`),
+      all joined before the editor.
+
+    `with_editor=False` stops after the summaries (the daemon's ingest runs).
+    """
+    # 1. Define the workflow
+    workflow = StateGraph(AgentState)
+
+    if mode == "fanout":
+        # 2. Add Nodes
+        workflow.add_node("company", company_pipeline, input_schema=CompanyTask)
+
+        # 3. Fan out from the start, join at the editor
+        workflow.add_conditional_edges(START, fan_out_companies, ["company"])
+        if not with_editor:
+            workflow.add_edge("company", END)
+            return workflow
+        workflow.add_node("editor", editor_writer)
+        workflow.add_edge("company", "editor")
+        workflow.add_edge("editor", END)
+        return workflow
+
+    if mode != "linear":
+        raise ValueError(f"Unknown graph mode: {mode}")
+
+    # 2. Add Nodes
+    workflow.add_node("monitor", monitor_news)
+    workflow.add_node("scraper", scraper_node)
+    workflow.add_node("dedup", dedup_node)
+    workflow.add_node("summarizer", summarize_node)
+
+    # 3. Set Entry Point
+    workflow.set_entry_point("monitor")
+
+    # 4. Add Simple Linear Edges
+    workflow.add_edge("monitor", "scraper")
+    workflow.add_edge("scraper", "dedup")
+    workflow.add_edge("dedup", "summarizer")
+    if not with_editor:
+        workflow.add_edge("summarizer", END)
+        return workflow
+    workflow.add_node("editor", editor_writer)
+    workflow.add_edge("summarizer", "editor")
+    workflow.add_edge("editor", END)
+    return workflow
 
-# 4. Add Simple Linear Edges
-workflow.add_edge("monitor", "scraper")
-workflow.add_edge("scraper", "summarizer")
-workflow.add_edge("summarizer", "editor")
-workflow.add_edge("editor", END)
 
 # 5. Compile
-workflow_app = workflow.compile()
+workflow_app = build_workflow(CONFIG["graph_mode"]).compile()
@@ -1,305 +1,737 @@
 import asyncio
 import datetime
 import random
-import re
 import time
-
-from app.agent.prompts import get_analysis_prompt, get_editor_prompt
-from app.config import BLACKLIST_DOMAINS, CONFIG, TARGET_COMPANIES
-from app.services.llm import article_summarizer, newsletter_generator
+from typing import Dict, List, Optional
+
+from app.agent.prompts import get_analysis_prompt, get_editor_prompt, get_section_prompt, get_summary_prompt
+from app.config import (
+    BLACKLIST_DOMAINS,
+    CONFIG,
+    MODEL_FAST,
+    NEWSLETTER_PROFILES,
+    TARGET_COMPANIES,
+    NewsletterProfile,
+    TargetCompany,
+)
+from app.schemas import Article, CompanySection, Newsletter, SearchHit, SummaryRecord
+from app.services.batch import batch_summarizer
+from app.services.budget import apply_budget
+from app.services.cache import search_cache, summary_cache
+from app.services.checkpoint import run_id_of, run_progress
+from app.services.dedup import ClusterRegistry, cluster_articles, fold_duplicates
+from app.services.history import seen_store
+from app.services.matcher import company_matcher
+from app.services.llm import (
+    ainvoke_llm,
+    article_summarizer,
+    cached_system_message,
+    newsletter_generator,
+    section_writer,
+    summary_writer,
+)
+from app.services.rate_limit import LoopLocal
 from app.services.scraper import scrape_url
-from app.services.search import tavily_news
-from app.state import AgentState
+from app.services.search import search_news
+from app.state import AgentState, CompanyTask
+from app.telemetry import telemetry, timed_stage
 from dateutil import parser as date_parser
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+MIN_DATE = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
 
 
-def monitor_news(state: AgentState):
+def build_article_message(article: Article) -> str:
     """
-    Node 1: News Analyst.
-    Searches for latest news on the target companies.
-    Selects strictly the top 2 articles per company at most.
+    Renders an article as the Summarizer's user message.
+    The METADATA lines are what the analysis prompt anchors its dates on.
     """
-    print(f"\n [Step 1] Monitoring {len(TARGET_COMPANIES)} Companies")
+    return (
+        f"Article Content:\n"
+        f"METADATA_DATE: {article.hit.date_display}\n"
+        f"METADATA_URL: {article.hit.url}\n"
+        f"FULL ARTICLE CONTENT:\n{article.content}\n---\n"
+    )
 
-    # 1. Setup & Date Constraints
-    existing_urls = set(state.get("seen_urls", []))
-    cutoff_date = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
-        days=CONFIG["days_back"]
+
+def format_summary(record: SummaryRecord) -> str:
+    """
+    Renders a summary record as text for the Editor prompt.
+    """
+    summary = record.summary
+    points_str = "\n- ".join(summary.key_points)
+    return (
+        f"Title: {summary.title}\n"
+        f"Entity: {summary.primary_company}\n"
+        f"Relevance: {summary.relevance_score}\n"
+        f"Key Points:\n- {points_str}\n"
+        f"Date: {record.hit.date_display}\n"
+        f"Source: {record.hit.url}"
+        + "".join(f"\nAlso reported by: {hit.url}" for hit in record.duplicates)
     )
+
+
+# Process-wide scrape limit, shared by the linear nodes and all fan-out branches
+# (LLM calls are limited adaptively in app/services/llm.py)
+scrape_semaphore = LoopLocal(lambda: asyncio.Semaphore(CONFIG.get("max_concurrency", 3)))
+# Fan-out: run-wide near-duplicate index shared by all company branches
+cluster_registry = LoopLocal(lambda: ClusterRegistry(CONFIG["dedup_threshold"]))
+
+
+def get_search_window(since: Optional[str] = None):
+    """
+    Returns (start_date string for Tavily, cutoff datetime for client-side filtering).
+    `since` (ISO timestamp) narrows the default `days_back` window, e.g. to the last daemon poll.
+    The `since` window starts `daemon_poll_overlap_hours` early, so hits indexed late or dated
+    by day only are not lost.
+    A search replay filters as of the time the responses were recorded.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    recorded = search_cache.last_fetched() if search_cache.replay else None
+    if recorded:
+        now = datetime.datetime.fromtimestamp(recorded, datetime.timezone.utc)
+    cutoff_date = now - datetime.timedelta(days=CONFIG["days_back"])
+    if since:
+        since_date = date_parser.isoparse(since)
+        if since_date.tzinfo is None:
+            since_date = since_date.replace(tzinfo=datetime.timezone.utc)
+        since_date -= datetime.timedelta(hours=CONFIG["daemon_poll_overlap_hours"])
+        if since_date > cutoff_date:
+            return since_date.strftime("%Y-%m-%d"), since_date
     cutoff_date_str = cutoff_date.strftime("%Y-%m-%d")
-    cutoff_date = cutoff_date - datetime.timedelta(days=1)
+    return cutoff_date_str, cutoff_date - datetime.timedelta(days=1)
 
-    # 2. Collect ALL candidates first (Bucketed by Company)
-    company_buckets = {t["name"]: [] for t in TARGET_COMPANIES}
-    new_urls = []
 
-    for target in TARGET_COMPANIES:
-        company = target["name"]
-        keywords = target["keywords"]
-        print(f"   -> Checking: {company}...")
-        query = f'Latest important news, updates, and AI developments involving "{company}".'
-        try:
-            response = tavily_news.invoke({"query": query, "start_date": cutoff_date_str})
-            hits = response.get("results", []) if isinstance(response, dict) else response
-
-            if isinstance(hits, list):
-                for item in hits:
-                    url = item.get("url", "")
-                    pub_date_str = item.get("published_date", None)
-                    tavily_score = item.get("score", 0.0)
-
-                    # Quality Gate
-                    if tavily_score < CONFIG["min_search_score"]:
-                        print(f"      x Low Score ({tavily_score:.2f}) Skipping: {url}")
-                        continue
+async def search_company(target: TargetCompany, start_date: str):
+    """
+    Runs the Tavily query for one company. Returns the raw response or None on error.
+    """
+    company = target["name"]
+    print(f"   -> Checking: {company}...")
+    query = f'Latest important news, updates, and AI developments involving "{company}".'
+    try:
+        return await search_news(query, start_date)
+    except Exception as e:
+        print(f"      x Error checking {company}: {e}")
+        return None
 
-                    # Deduplication and blacklist check
-                    if url in existing_urls or any(bad in url for bad in BLACKLIST_DOMAINS):
-                        continue
 
-                    # Date Check
-                    pub_date = None
-                    if pub_date_str:
-                        try:
-                            pub_date = date_parser.parse(pub_date_str)
-                            if pub_date.tzinfo is None:
-                                pub_date = pub_date.replace(tzinfo=datetime.timezone.utc)
-                            if pub_date < cutoff_date:
-                                continue
-                        except Exception:
-                            pass
-
-                    # keyword check
-                    content = item.get("content", "")
-                    title = item.get("title", "")
-                    full_text = (title + " " + content).lower()
-                    if not any(k.lower() in full_text for k in keywords):
+def target_terms(target: TargetCompany) -> set:
+    return {term.lower().strip() for term in [target["name"], *target["keywords"]]}
+
+
+def group_targets(targets: List[TargetCompany], size: int) -> List[List[TargetCompany]]:
+    """
+    Packs targets into consolidated queries of at most `size` companies.
+    Each group starts at the first ungrouped target (the list runs roughly by tier) and is filled
+    with the targets sharing the most keywords with it, then in target order.
+    """
+    remaining = list(targets)
+    groups = []
+    while remaining:
+        group = [remaining.pop(0)]
+        terms = target_terms(group[0])
+        while remaining and len(group) < size:
+            # max() keeps the earliest target on ties
+            best = max(range(len(remaining)), key=lambda i: len(terms & target_terms(remaining[i])))
+            group.append(remaining.pop(best))
+            terms |= target_terms(group[-1])
+        groups.append(group)
+    return groups
+
+
+async def search_group(group: List[TargetCompany], start_date: str):
+    """
+    Runs one consolidated Tavily query for several companies. Returns the raw response or None on error.
+    """
+    names = [f'"{t["name"]}"' for t in group]
+    listed = names[0] if len(names) == 1 else ", ".join(names[:-1]) + " or " + names[-1]
+    print(f"   -> Checking: {', '.join(t['name'] for t in group)}...")
+    query = f"Latest important news, updates, and AI developments involving {listed}."
+    try:
+        return await search_news(query, start_date, broad=True)
+    except Exception as e:
+        print(f"      x Error checking {listed}: {e}")
+        return None
+
+
+def route_results(responses) -> Dict[str, list]:
+    """
+    Routes the results of consolidated queries to companies client-side: every result goes to
+    each target its title/content mentions, whichever query returned it.
+    """
+    routed: Dict[str, list] = {}
+    urls = set()
+    for response in responses:
+        if not isinstance(response, dict):
+            continue
+        for item in response.get("results", []):
+            if not isinstance(item, dict) or item.get("url") in urls:
+                continue
+            urls.add(item.get("url"))
+            for company in company_matcher.count((item.get("title") or "") + " " + (item.get("content") or "")):
+                routed.setdefault(company, []).append(item)
+    return routed
+
+
+async def search_consolidated(targets: List[TargetCompany], start_date: str) -> list:
+    """
+    Consolidated discovery: ceil(targets / companies_per_query) broad queries instead of one per
+    company. Returns one response per target (in target order) for `collect_hits`.
+    """
+    groups = group_targets(targets, CONFIG["companies_per_query"])
+    print(f"   -> {len(groups)} consolidated queries for {len(targets)} companies")
+    routed = route_results(await asyncio.gather(*(search_group(g, start_date) for g in groups)))
+    responses = {t["name"]: {"results": routed.get(t["name"], [])} for t in targets}
+
+    # Targets no broad query mentioned at all get their own query
+    missing = [t for t in targets if t["name"] not in routed] if CONFIG["consolidated_fallback"] else []
+    if missing:
+        print(f"   -> {len(missing)} companies not covered, querying them individually")
+        telemetry.count("search_fallbacks", len(missing))
+        fallback = await asyncio.gather(*(search_company(t, start_date) for t in missing))
+        responses.update({t["name"]: response for t, response in zip(missing, fallback)})
+    return [responses[t["name"]] for t in targets]
+
+
+def drop_previously_seen(responses, existing_urls: set):
+    """
+    Adds candidates processed in earlier runs to `existing_urls` (one bulk lookup).
+    """
+    candidate_urls = [
+        item.get("url") or ""
+        for response in responses
+        if isinstance(response, dict)
+        for item in response.get("results", [])
+        if isinstance(item, dict)
+    ]
+    try:
+        previously_seen = seen_store.filter_seen(candidate_urls)
+        existing_urls.update(previously_seen)
+        print(f"   -> {len(previously_seen)} candidates already covered in earlier runs.")
+    except Exception as e:
+        print(f"      x Seen-URL store unavailable: {e}")
+
+
+def collect_hits(target: TargetCompany, response, existing_urls: set, cutoff_date) -> List[SearchHit]:
+    """
+    Applies score, blacklist, date and keyword filters to one company's response.
+    Returns the bucket sorted by score then date; accepted URLs are added to `existing_urls`.
+    """
+    company = target["name"]
+    bucket = []
+    if response is None:
+        return bucket
+
+    hits = response.get("results", []) if isinstance(response, dict) else response
+
+    if not isinstance(hits, list):
+        print(f"      x Unexpected response format for {company}: {response}")
+        return bucket
+
+    try:
+        for item in hits:
+            # Skip malformed entries instead of failing the company
+            if not isinstance(item, dict):
+                continue
+            url = item.get("url") or ""
+            pub_date_str = item.get("published_date", None)
+            try:
+                tavily_score = float(item.get("score") or 0.0)
+            except (TypeError, ValueError):
+                tavily_score = 0.0
+
+            # Quality Gate
+            if tavily_score < CONFIG["min_search_score"]:
+                print(f"      x Low Score ({tavily_score:.2f}) Skipping: {url}")
+                continue
+
+            # Deduplication and blacklist check
+            if url in existing_urls or any(bad in url for bad in BLACKLIST_DOMAINS):
+                continue
+
+            # Date Check
+            pub_date = None
+            if pub_date_str:
+                try:
+                    pub_date = date_parser.parse(pub_date_str)
+                    if pub_date.tzinfo is None:
+                        pub_date = pub_date.replace(tzinfo=datetime.timezone.utc)
+                    if pub_date < cutoff_date:
                         continue
+                except Exception:
+                    pass
+
+            # keyword check (whole-word matches of the company's name/keywords)
+            content = item.get("content") or ""
+            title = item.get("title") or ""
+            if company not in company_matcher.count(title + " " + content):
+                continue
+
+            # Add to Bucket
+            hit = SearchHit(company=company, url=url, title=title, score=tavily_score, published=pub_date)
+
+            if not any(h.url == url for h in bucket):
+                bucket.append(hit)
+                existing_urls.add(url)
+    except Exception as e:
+        # One bad response only costs this company (hits collected so far are kept)
+        print(f"      x Error checking {company}: {e}")
+
+    # Sort by Score then Date
+    bucket.sort(key=lambda h: (h.score, h.published or MIN_DATE), reverse=True)
+    return bucket
+
+
+async def scrape_article(hit: SearchHit) -> Optional[Article]:
+    """
+    Scrapes one search hit under the shared scrape semaphore.
+    """
+    async with telemetry.queued(scrape_semaphore.get(), "scrape"):
+        # Add a small random delay to stagger browser launches (Stealth)
+        await asyncio.sleep(random.uniform(0.5, 2.0))
+
+        try:
+            # Call the async scrape_url function directly
+            content = await scrape_url(hit.url)
 
-                    # Add to Bucket
-                    date_display = pub_date.strftime("%Y-%m-%d") if pub_date else "Unknown Date"
-
-                    hit_data = {
-                        "score": tavily_score,
-                        "date": pub_date
-                        or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc),
-                        "company": company,
-                        "url": url,
-                        "string": f"[{company}] DATE: {date_display} | URL: {url} | TITLE: {title}",
-                    }
-
-                    if not any(h["url"] == url for h in company_buckets[company]):
-                        company_buckets[company].append(hit_data)
-                        existing_urls.add(url)
-                        new_urls.append(url)
+            if content:
+                # Use string slicing to keep logs clean
+                print(f"      > Scraped: {hit.url[:40]}... ({len(content)} chars)")
+                return Article(hit=hit, content=content)
             else:
-                print(f"      x Unexpected response format for {company}: {response}")
+                print(f"      x Failed to scrape: {hit.url[:40]}...")
+                return None
+
+        except Exception as e:
+            print(f"      x Error processing {hit.url[:40]}... : {e}")
+            return None
+
+
+def summary_key(article: Article):
+    """
+    Returns (system prompt, summary cache key) for an article.
+    """
+    system_instruction = get_analysis_prompt(tuple(t["name"] for t in TARGET_COMPANIES))
+    # Content-only key, so reprints of the same text hit too
+    return system_instruction, summary_cache.make_key(article.content, MODEL_FAST, system_instruction)
+
+
+def cached_summary(cache_key: str):
+    try:
+        return summary_cache.get(cache_key)
+    except Exception as e:
+        print(f"      x Summary cache error: {e}")
+        return None
+
+
+def store_summary(cache_key: str, summary):
+    # A failed write (e.g. a locked database) must not discard a summary that was already paid for
+    try:
+        summary_cache.put(cache_key, summary)
+    except Exception as e:
+        print(f"      x Summary cache error: {e}")
+
+
+async def summarize_article(
+    article: Article, index: int, check_cache: bool = True, cache_key: Optional[str] = None
+) -> Optional[SummaryRecord]:
+    """
+    Summarizes a single article.
+
+    :param article: Scraped article to summarize
+    :param index: Index for logging
+    :param check_cache: False when the caller already looked the article up
+    :param cache_key: Key of the untrimmed article, so the token budget's trim does not change it
+    :return: SummaryRecord or None on failure
+    """
+    system_instruction, own_key = summary_key(article)
+    cache_key = cache_key or own_key
+    result = cached_summary(cache_key) if check_cache else None
+
+    if result is None:
+        # Concurrency is governed by the shared adaptive limiter inside ainvoke_llm
+        try:
+            start = time.perf_counter()
+            # Invoke the LLM (Returns ArticleSummary Object)
+            result = await ainvoke_llm(
+                article_summarizer,
+                [
+                    cached_system_message(system_instruction),
+                    HumanMessage(content=build_article_message(article)),
+                ],
+                label="summarize",
+            )
+            telemetry.item("summarize", article.hit.url, time.perf_counter() - start, cached=False)
+
         except Exception as e:
-            print(f"      x Error checking {company}: {e}")
+            # Log specific error but don't crash the whole batch
+            print(f"      x Error summarizing article {index}: {e}")
+            telemetry.item("summarize", article.hit.url, 0.0, cached=False, error=str(e))
+            return None
+        store_summary(cache_key, result)
+    else:
+        telemetry.item("summarize", article.hit.url, 0.0, cached=True)
+
+    return SummaryRecord(hit=article.hit, summary=result, duplicates=article.duplicates)
 
-        # Sort by Score then Date
-        company_buckets[company].sort(key=lambda x: (x["score"], x["date"]), reverse=True)
-        time.sleep(CONFIG["rate_limit_delay"])
 
-    # 3. Select Top 2 articles per company
+async def summarize_batch(
+    articles: List[Article], cache_keys: Optional[Dict[str, str]] = None
+) -> List[Optional[SummaryRecord]]:
+    """
+    Batch mode: cache hits are served directly, every miss goes into ONE Message Batch.
+    Items the batch could not summarize fall back to the interactive path.
+    `cache_keys` maps URLs to the keys of the untrimmed articles.
+    """
+    cache_keys = cache_keys or {}
+    records: List[Optional[SummaryRecord]] = [None] * len(articles)
+    pending = {}
+    system_instruction = None
+    for i, article in enumerate(articles):
+        system_instruction, cache_key = summary_key(article)
+        cache_key = cache_keys.get(article.hit.url, cache_key)
+        cached = cached_summary(cache_key)
+        if cached is not None:
+            telemetry.item("summarize", article.hit.url, 0.0, cached=True)
+            records[i] = SummaryRecord(hit=article.hit, summary=cached, duplicates=article.duplicates)
+        else:
+            pending[f"article-{i}"] = (i, cache_key)
+
+    if len(pending) < CONFIG["batch_min_articles"]:
+        print(f"   -> Only {len(pending)} uncached articles, summarizing interactively.")
+        fallback = list(pending.values())
+    else:
+        start = time.perf_counter()
+        results = await batch_summarizer.summarize(
+            system_instruction,
+            {custom_id: build_article_message(articles[i]) for custom_id, (i, _) in pending.items()},
+        )
+        duration = time.perf_counter() - start
+        fallback = []
+        for custom_id, (i, cache_key) in pending.items():
+            summary = results.get(custom_id)
+            if summary is None:
+                fallback.append((i, cache_key))
+                continue
+            telemetry.item("summarize", articles[i].hit.url, duration, cached=False, batch=True)
+            store_summary(cache_key, summary)
+            records[i] = SummaryRecord(hit=articles[i].hit, summary=summary, duplicates=articles[i].duplicates)
+        if fallback:
+            print(f"   -> {len(fallback)} batch items failed, retrying interactively.")
+
+    retried = await asyncio.gather(
+        *(
+            summarize_article(articles[i], n, check_cache=False, cache_key=cache_key)
+            for n, (i, cache_key) in enumerate(fallback)
+        )
+    )
+    for (i, _), record in zip(fallback, retried):
+        records[i] = record
+    return records
+
+
+@timed_stage("monitor")
+async def monitor_news(state: AgentState):
+    """
+    Node 1: News Analyst.
+    Searches for latest news on the target companies.
+    Selects strictly the top 2 articles per company at most.
+    """
+    print(f"\n [Step 1] Monitoring {len(TARGET_COMPANIES)} Companies")
+
+    # 1. Setup & Date Constraints
+    existing_urls = set(state.get("seen_urls", []))
+    cutoff_date_str, cutoff_date = get_search_window(state.get("search_since"))
+
+    # 2. Fan out all queries at once (throttled by the shared token bucket)
+    if CONFIG["search_mode"] == "consolidated":
+        responses = await search_consolidated(TARGET_COMPANIES, cutoff_date_str)
+    else:
+        responses = await asyncio.gather(*(search_company(t, cutoff_date_str) for t in TARGET_COMPANIES))
+
+    # 3. Drop candidates already processed in earlier runs
+    try:
+        seen_store.prune()
+        search_cache.prune()
+    except Exception as e:
+        print(f"      x Could not prune seen-URL store / search cache: {e}")
+    drop_previously_seen(responses, existing_urls)
+
+    # 4. Collect ALL candidates (Bucketed by Company, in target order so dedup is deterministic)
+    company_buckets = {
+        target["name"]: collect_hits(target, response, existing_urls, cutoff_date)
+        for target, response in zip(TARGET_COMPANIES, responses)
+    }
+    new_urls = [h.url for bucket in company_buckets.values() for h in bucket]
+
+    # 5. Select Top 2 articles per company
     final_results = []
     # Iterate through every target company (ensures we check every bucket)
     for company_name in company_buckets:
         bucket = company_buckets[company_name]
 
         # Take the top 2 (or less).
-        top_picks = bucket[:2]
-        for hit in top_picks:
-            final_results.append(hit["string"])
+        final_results.extend(bucket[:2])
 
     if not final_results:
-        final_results = ["No significant news found for any target company."]
+        print("   -> No significant news found for any target company.")
 
     print(f"\n   -> Selected {len(final_results)} articles (Top 2 per company).")
     return {"search_results": final_results, "seen_urls": new_urls, "steps": 1}
 
 
-async def scraper_node(state: AgentState):
+@timed_stage("scraper")
+async def scraper_node(state: AgentState, config: RunnableConfig = None):
     """
     Node 2: The Stealth Hybrid Reader (Async + Concurrent).
     Fetches the content for the selected articles from Step 1 concurrently.
+    In a checkpointed run, every scraped article is recorded so a resumed run skips it.
     """
     print(f"\n--- [Step 2] Scraping Full Articles (Concurrent) ---")
 
-    # 1. Parse the search_results List
-    search_results = state.get("search_results", [])
-    urls_to_scrape = []
-    url_to_date = {}
-
-    for res in search_results:
-        try:
-            if " | URL: " in res:
-                meta_part, rest = res.split(" | URL: ", 1)
-                date_str = meta_part.split("DATE: ")[1].strip()
-
-                if " | TITLE: " in rest:
-                    url = rest.split(" | TITLE: ")[0].strip()
-                else:
-                    url = rest.strip()
-
-                urls_to_scrape.append(url)
-                url_to_date[url] = date_str
-        except Exception as e:
-            print(f"   x Parsing Error on result: {str(e)}")
-            continue
-
-    # 2. Safety Limit
-    if len(urls_to_scrape) > 36:
-        print(f"   (Limiting scrape to first 36 of {len(urls_to_scrape)} balanced URLs)")
-        urls_to_scrape = urls_to_scrape[:36]
-
-    # 3. Concurrency Control (The Semaphore)
-    semaphore = asyncio.Semaphore(CONFIG.get("max_concurrency", 3))
-
-    async def scrape_one(url):
-        async with semaphore:
-            # Add a small random delay to stagger browser launches (Stealth)
-            await asyncio.sleep(random.uniform(0.5, 2.0))
-
-            try:
-                # Call the async scrape_url function directly
-                content = await scrape_url(url)
-
-                if content:
-                    # Re-attach the date
-                    date_str = url_to_date.get(url, "Unknown Date")
-
-                    full_text = f"METADATA_DATE: {date_str}\n" f"METADATA_URL: {url}\n" f"{content}"
-                    # Use string slicing to keep logs clean
-                    print(f"      > Scraped: {url[:40]}... ({len(content)} chars)")
-                    return full_text
-                else:
-                    print(f"      x Failed to scrape: {url[:40]}...")
-                    return None
-
-            except Exception as e:
-                print(f"      x Error processing {url[:40]}... : {e}")
-                return None
-
-    # 4. Launch Tasks concurrently
-    tasks = [scrape_one(url) for url in urls_to_scrape]
-    results = await asyncio.gather(*tasks)
-
-    # 5. Filter out failures (None)
+    # 1. Safety Limit
+    hits = state.get("search_results", [])
+    max_articles = CONFIG["max_articles"]
+    if len(hits) > max_articles:
+        print(f"   (Limiting scrape to first {max_articles} of {len(hits)} balanced URLs)")
+        hits = hits[:max_articles]
+
+    # 2. Articles an interrupted attempt of this run already scraped
+    run_id = run_id_of(config)
+    done = {}
+    if run_id:
+        done = {url: Article.model_validate_json(p) for url, p in run_progress.load(run_id, "scrape").items()}
+        if done:
+            print(f"   -> Resuming run {run_id}: {len(done)} articles already scraped.")
+
+    async def scrape_resumable(hit: SearchHit) -> Optional[Article]:
+        if hit.url in done:
+            return done[hit.url]
+        article = await scrape_article(hit)
+        if article is not None and run_id:
+            run_progress.save(run_id, "scrape", hit.url, article.model_dump_json())
+        return article
+
+    # 3. Launch Tasks concurrently (bounded by the shared scrape semaphore)
+    results = await asyncio.gather(*(scrape_resumable(hit) for hit in hits))
+
+    # 4. Filter out failures (None)
     valid_articles = [r for r in results if r is not None]
 
     print(f"   -> Successfully scraped {len(valid_articles)} articles.")
     return {"scraped_articles": valid_articles, "steps": 1}
 
 
-async def summarize_node(state: AgentState):
+@timed_stage("dedup")
+async def dedup_node(state: AgentState):
     """
-    Node 3: The Summarizer (Throttled).
-    Uses 'article_summarizer' (Pydantic) to extract structured data,
-    then converts it to a string for the Editor.
+    Node 2b: Near-Duplicate Filter.
+    Clusters syndicated copies of the same story (MinHash over word shingles) so only
+    one representative per cluster is summarized; the others become extra sources.
     """
-    scraped_content = state.get("scraped_articles", [])
-    print(f"\n--- [Step 3] Summarizing {len(scraped_content)} Articles ---")
+    articles = state.get("scraped_articles", [])
+    print(f"\n--- [Step 2b] Detecting Near-Duplicates in {len(articles)} Articles ---")
 
-    # 1. Define the Semaphore (The Bouncer)
-    # This limits concurrent API calls to prevent 429 errors.
-    semaphore = asyncio.Semaphore(CONFIG.get("max_concurrency", 3))
-    target_names = [t["name"] for t in TARGET_COMPANIES]
-
-    async def summarize_one(text, index):
-        """
-        Summarizes a single article.
+    # Hashing is CPU bound, keep it off the event loop
+    unique = await asyncio.to_thread(cluster_articles, articles, CONFIG["dedup_threshold"])
 
-        :param text: Article text to summarize
-        :param index: Index for logging
-        :return: Formatted summary string or None on failure
-        """
-        async with semaphore:
-            try:
-                date_match = re.search(r"METADATA_DATE: (.*?)\n", text)
-                url_match = re.search(r"METADATA_URL: (.*?)\n", text)
-
-                meta_date = date_match.group(1).strip() if date_match else "Unknown Date"
-                meta_url = url_match.group(1).strip() if url_match else "Unknown URL"
-                # Stagger requests slightly to avoid a "thundering herd"
-                await asyncio.sleep(0.5 + (index * 0.1))
-                system_instruction = get_analysis_prompt(target_names)
-                # 2. Invoke the LLM (Returns ArticleSummary Object)
-                result = await article_summarizer.ainvoke(
-                    [
-                        SystemMessage(content=system_instruction),
-                        HumanMessage(content=f"Article Content:\n{text}"),
-                    ]
-                )
-
-                # 3. Handle the Pydantic Object
-                # Join bullet points into a string
-                points_str = "\n- ".join(result.key_points)
-
-                formatted_summary = (
-                    f"Title: {result.title}\n"
-                    f"Entity: {result.primary_company}\n"
-                    f"Relevance: {result.relevance_score}\n"
-                    f"Key Points:\n- {points_str}\n"
-                    f"Date: {meta_date}\n"
-                    f"Source: {meta_url}"
-                )
-
-                return formatted_summary
-
-            except Exception as e:
-                # Log specific error but don't crash the whole batch
-                print(f"      x Error summarizing article {index}: {e}")
-                return None
+    folded = len(articles) - len(unique)
+    telemetry.count("dedup_duplicates", folded)
+    print(f"   -> {len(unique)} unique stories ({folded} near-duplicates attached as extra sources).")
+    return {"unique_articles": unique, "steps": 1}
 
-    # 4. Create and Run Tasks
-    tasks = [summarize_one(text, i) for i, text in enumerate(scraped_content)]
-    summaries = await asyncio.gather(*tasks)
 
-    # 5. Filter out failures (None)
+@timed_stage("summarizer")
+async def summarize_node(state: AgentState, config: RunnableConfig = None):
+    """
+    Node 3: The Summarizer (Throttled).
+    Uses 'article_summarizer' (Pydantic) to extract structured data
+    and attaches it to the search hit as a SummaryRecord for the Editor.
+    In a checkpointed run, every summary is recorded so a resumed run skips it.
+    """
+    articles = state.get("unique_articles", [])
+    print(f"\n--- [Step 3] Summarizing {len(articles)} Articles ---")
+
+    # 0. Fit all articles into the run's input-token budget. Summary cache keys come from the
+    # untrimmed text: an article's share depends on the rest of the run, its key must not.
+    cache_keys = {article.hit.url: summary_key(article)[1] for article in articles}
+    # Tokenizing and keyword scans are CPU bound, keep them off the event loop
+    articles = await asyncio.to_thread(apply_budget, articles, CONFIG["run_input_token_budget"])
+
+    # 1. Summaries an interrupted attempt of this run already produced
+    run_id = run_id_of(config)
+    done = {}
+    if run_id:
+        done = {url: SummaryRecord.model_validate_json(p) for url, p in run_progress.load(run_id, "summarize").items()}
+        if done:
+            print(f"   -> Resuming run {run_id}: {len(done)} articles already summarized.")
+    todo = [article for article in articles if article.hit.url not in done]
+
+    def record(summary: Optional[SummaryRecord]) -> Optional[SummaryRecord]:
+        if summary is not None and run_id:
+            run_progress.save(run_id, "summarize", summary.hit.url, summary.model_dump_json())
+        return summary
+
+    async def summarize_resumable(article: Article, index: int) -> Optional[SummaryRecord]:
+        return record(await summarize_article(article, index, cache_key=cache_keys[article.hit.url]))
+
+    # 2. Create and Run Tasks (bounded by the shared LLM limiter), or submit one batch
+    if CONFIG["summarize_mode"] == "batch":
+        fresh = [record(summary) for summary in await summarize_batch(todo, cache_keys)]
+    else:
+        fresh = await asyncio.gather(*(summarize_resumable(article, i) for i, article in enumerate(todo)))
+    fresh_by_url = {article.hit.url: summary for article, summary in zip(todo, fresh)}
+    summaries = [done.get(a.hit.url) or fresh_by_url.get(a.hit.url) for a in articles]
+
+    # 3. Filter out failures (None). URLs are only marked as seen once the issue is published.
     valid_summaries = [s for s in summaries if s]
 
-    print(f"   -> Generated {len(valid_summaries)} valid summaries.")
+    print(
+        f"   -> Generated {len(valid_summaries)} valid summaries "
+        f"(cache: {summary_cache.hits} hits / {summary_cache.misses} misses)."
+    )
     return {"summaries": valid_summaries, "steps": 1}
 
 
-def editor_writer(state: AgentState):
+async def company_pipeline(task: CompanyTask):
     """
-    Node 4: Editor-in-Chief.
-    Synthesizes the final newsletter report."""
-    print("\n [Step 4] Synthesizing Final Report")
-    today = datetime.datetime.now().strftime("%B %d, %Y")
+    Fan-out branch: search -> scrape -> summarize for ONE company.
+    Branches run independently; the Editor joins them.
+    """
+    target = task["target"]
+    started = time.perf_counter()
+    existing_urls = set(task.get("seen_urls", []))
+    cutoff_date_str, cutoff_date = get_search_window(task.get("search_since"))
+
+    # 1. Search & select the top 2 hits
+    response = await search_company(target, cutoff_date_str)
+    drop_previously_seen([response], existing_urls)
+    hits = collect_hits(target, response, existing_urls, cutoff_date)[:2]
+
+    # 2. Scrape, then summarize as soon as each article arrives.
+    # Each branch owns an equal slice of the run budget, split between its hits by score.
+    company_budget = CONFIG["run_input_token_budget"] // max(len(TARGET_COMPANIES), 1)
+    total_score = sum(max(h.score, 0.01) for h in hits)
+    registry = cluster_registry.get()
+
+    async def summarize(article: Article, index: int):
+        share = int(company_budget * max(article.hit.score, 0.01) / total_score)
+        cache_key = summary_key(article)[1]
+        trimmed = (await asyncio.to_thread(apply_budget, [article], share))[0]
+        return await summarize_article(trimmed, index, cache_key=cache_key)
+
+    async def process(hit: SearchHit, index: int):
+        article = await scrape_article(hit)
+        if article is None:
+            return None, None
+
+        # 3. A near-duplicate of a story another branch already claimed reuses its summary
+        claim = registry.claim(article)
+        if claim is not None:
+            representative_url, pending = claim
+            representative = await pending
+            if representative is not None:
+                telemetry.count("dedup_duplicates")
+                print(f"      > Near-duplicate of {representative_url[:40]}..., reusing its summary.")
+                record = SummaryRecord(hit=hit, summary=representative.summary, duplicate_of=representative_url)
+                return article, record
+            return article, await summarize(article, index)
+
+        record = None
+        try:
+            record = await summarize(article, index)
+        finally:
+            registry.resolve(hit.url, record)
+        return article, record
 
-    # Get List of Target Names for strict matching
-    target_names = [t["name"] for t in TARGET_COMPANIES]
+    results = await asyncio.gather(*(process(hit, i) for i, hit in enumerate(hits)))
+    articles = [a for a, _ in results if a is not None]
+    summaries = [s for _, s in results if s is not None]
 
-    # Group Summaries
+    telemetry.item(
+        "company", target["name"], time.perf_counter() - started, hits=len(hits), summaries=len(summaries)
+    )
+    print(f"   -> {target['name']}: {len(hits)} hits, {len(articles)} scraped, {len(summaries)} summarized.")
+    return {
+        "search_results": hits,
+        "scraped_articles": articles,
+        "summaries": summaries,
+        "seen_urls": [h.url for h in hits],
+    }
+
+
+def fan_out_companies(state: AgentState):
+    """
+    Conditional entry edge for fan-out mode: one Send per target company.
+    """
+    from langgraph.types import Send
+
+    print(f"\n [Fan-out] Launching {len(TARGET_COMPANIES)} company pipelines")
+    seen_urls = state.get("seen_urls", [])
+    # Fresh near-duplicate index for this run
+    cluster_registry.reset()
+    try:
+        seen_store.prune()
+        search_cache.prune()
+    except Exception as e:
+        print(f"      x Could not prune seen-URL store / search cache: {e}")
+    since = state.get("search_since")
+    return [
+        Send("company", {"target": t, "seen_urls": seen_urls, "search_since": since}) for t in TARGET_COMPANIES
+    ]
+
+
+def group_by_company(records: List[SummaryRecord], target_names: List[str]):
+    """
+    Buckets summary records by target company (via the shared matcher).
+    Returns ({company: [formatted summaries]}, [formatted summaries of other news]).
+    """
     grouped_content = {name: [] for name in target_names}
     unknown_bucket = []
 
     print("\n   [DEBUG] Grouping Articles:")
 
-    for summary_str in state.get("summaries", []):
-        # Extract Primary Company Tag
-        primary_match = re.search(r"Entity: (.*?)\n", summary_str)
-        primary_entity = primary_match.group(1).strip() if primary_match else "Unknown"
-
-        print(f"   - Entity: '{primary_entity}' | Title: {summary_str.split('\n')[0][7:]}...")
+    for record in records:
+        primary_entity = record.summary.primary_company
+        summary_str = format_summary(record)
 
-        # Assign to Bucket
-        found_bucket = False
-        for name in target_names:
-            # Match if the Primary Entity string *contains* the target name
-            # e.g. "Microsoft AI" contains "Microsoft"
-            if name.lower() in primary_entity.lower():
-                grouped_content[name].append(summary_str)
-                found_bucket = True
-                break
+        print(f"   - Entity: '{primary_entity}' | Title: {record.summary.title}...")
 
-        if not found_bucket:
+        # Assign to Bucket: the target whose name/keywords the entity matches best
+        # e.g. "Microsoft AI" -> Microsoft AI, "ChatGPT" -> OpenAI
+        bucket = company_matcher.best(primary_entity)
+        if bucket in grouped_content:
+            grouped_content[bucket].append(summary_str)
+        else:
             unknown_bucket.append(summary_str)
 
+    return grouped_content, unknown_bucket
+
+
+def render_newsletter(newsletter: Newsletter, today: str) -> str:
+    """
+    Formats the Editor's output as the final Markdown report.
+    """
+    final_md = f"# THE DAILY AI | Market Report\n**{today}**\n\n---\n\n## EXECUTIVE SUMMARY\n\n"
+    for item in newsletter.executive_summary:
+        final_md += f"- {item}\n"
+
+    final_md += "\n---\n\n## DETAILED COMPANY REPORTS\n\n"
+    for report in newsletter.company_reports:
+        # Filter out empty or "no news" sections
+        if len(report.update) > 50 and "no significant news" not in report.update.lower():
+            final_md += f"### {report.name}\n\n{report.update}\n\n"
+
+    final_md += "\n\n---\n**Report compiled by The Daily AI Editorial Team**"
+    return final_md
+
+
+async def write_newsletter(grouped_content, unknown_bucket, today: str, target_names: List[str]) -> Newsletter:
+    """
+    Single-call editor: the whole Newsletter from one prompt with all grouped news.
+    """
     # Construct String Input
     structured_news_input = ""
     for company, items in grouped_content.items():
@@ -312,26 +744,139 @@ def editor_writer(state: AgentState):
         structured_news_input += "\n".join(unknown_bucket)
 
     # Generate Prompt using the helper from prompts.py
-    system_prompt_str = get_editor_prompt(today, target_names)
+    system_prompt_str = get_editor_prompt(today, tuple(target_names))
 
     user_message = f"GROUPED NEWS:\n{structured_news_input}\n"
 
     # Invoke Editor
-    newsletter = newsletter_generator.invoke(
-        [SystemMessage(content=system_prompt_str), HumanMessage(content=user_message)]
+    return await ainvoke_llm(
+        newsletter_generator,
+        [cached_system_message(system_prompt_str), HumanMessage(content=user_message)],
+        label="editor",
     )
 
-    # Formatting to Markdown
-    final_md = f"# THE DAILY AI | Market Report\n**{today}**\n\n---\n\n## EXECUTIVE SUMMARY\n\n"
-    for item in newsletter.executive_summary:
-        final_md += f"- {item}\n"
 
-    final_md += "\n---\n\n## DETAILED COMPANY REPORTS\n\n"
-    for report in newsletter.company_reports:
-        # Filter out empty or "no news" sections
-        if len(report.update) > 50 and "no significant news" not in report.update.lower():
-            final_md += f"### {report.name}\n\n{report.update}\n\n"
+async def write_section(company: str, items: List[str], today: str) -> Optional[CompanySection]:
+    """
+    Map step: one CompanySection from that company's summaries only.
+    A failed section is dropped instead of failing the whole report.
+    """
+    user_message = f"### NEWS FOR {company.upper()} ###\n" + "\n".join(items) + "\n"
+    try:
+        section = await ainvoke_llm(
+            section_writer,
+            [cached_system_message(get_section_prompt(today)), HumanMessage(content=user_message)],
+            label="editor_section",
+        )
+    except Exception as e:
+        print(f"      x Section for {company} failed: {e}")
+        return None
+    # Keep the canonical target name for the heading
+    return section.model_copy(update={"name": company})
+
+
+async def write_sections(grouped_content, today: str) -> Dict[str, CompanySection]:
+    """
+    Map step for every company with news, concurrently. Returns {company: section}.
+    """
+    companies = [company for company, items in grouped_content.items() if items]
+    print(f"   -> Writing {len(companies)} company sections concurrently...")
+    sections = await asyncio.gather(*(write_section(c, grouped_content[c], today) for c in companies))
+    return {company: section for company, section in zip(companies, sections) if section is not None}
 
-    final_md += "\n\n---\n**Report compiled by The Daily AI Editorial Team**"
 
-    return {"final_report": final_md, "steps": 1}
+async def summarize_sections(sections: List[CompanySection], today: str) -> Newsletter:
+    """
+    Reduce step: the executive summary from finished sections.
+    """
+    sections_input = "\n\n".join(f"### {s.name} ###\n{s.update}" for s in sections)
+    try:
+        summary = await ainvoke_llm(
+            summary_writer,
+            [cached_system_message(get_summary_prompt(today)), HumanMessage(content=sections_input)],
+            label="editor_summary",
+        )
+        executive_summary = summary.executive_summary
+    except Exception as e:
+        print(f"      x Executive summary failed, using section leads: {e}")
+        executive_summary = [f"{s.name}: {s.update.split('. ')[0].rstrip('.')}." for s in sections]
+
+    return Newsletter(executive_summary=executive_summary, company_reports=sections)
+
+
+async def write_newsletter_mapreduce(grouped_content, today: str) -> Newsletter:
+    """
+    Map-reduce editor: all company sections concurrently, then a small call for the
+    executive summary. Latency is about one section call plus the summary call,
+    and no single prompt grows with the number of companies.
+    """
+    sections = await write_sections(grouped_content, today)
+    return await summarize_sections(list(sections.values()), today)
+
+
+async def write_profile_reports(grouped_content, unknown_bucket, today: str) -> Dict[str, str]:
+    """
+    One report per entry of NEWSLETTER_PROFILES, all from the shared summary set.
+    Each profile only sees its own companies. In map-reduce mode every company section
+    is written once and shared, so a profile costs a single summary call.
+    """
+    profiles = NEWSLETTER_PROFILES
+    print(f"   -> Rendering {len(profiles)} newsletter profiles concurrently...")
+
+    def profile_news(profile: NewsletterProfile):
+        return {name: grouped_content.get(name, []) for name in profile["companies"]}
+
+    if CONFIG["editor_mode"] == "mapreduce":
+        sections = await write_sections(grouped_content, today)
+
+        async def write_profile(profile: NewsletterProfile) -> Newsletter:
+            return await summarize_sections([sections[c] for c in profile["companies"] if c in sections], today)
+
+    else:
+
+        async def write_profile(profile: NewsletterProfile) -> Newsletter:
+            return await write_newsletter(profile_news(profile), unknown_bucket, today, profile["companies"])
+
+    newsletters = await asyncio.gather(*(write_profile(p) for p in profiles), return_exceptions=True)
+
+    reports = {}
+    for profile, newsletter in zip(profiles, newsletters):
+        if isinstance(newsletter, BaseException):
+            # One failed segment does not hold back the others
+            print(f"      x Profile '{profile['name']}' failed: {newsletter}")
+            continue
+        reports[profile["name"]] = render_newsletter(newsletter, today)
+    return reports
+
+
+@timed_stage("editor")
+async def editor_writer(state: AgentState):
+    """
+    Node 4: Editor-in-Chief.
+    Synthesizes the final newsletter report (one per profile if NEWSLETTER_PROFILES is set)."""
+    print("\n [Step 4] Synthesizing Final Report")
+    today = datetime.datetime.now().strftime("%B %d, %Y")
+
+    # Get List of Target Names for strict matching
+    target_names = [t["name"] for t in TARGET_COMPANIES]
+
+    # Fan-out branches may pick the same URL for two companies; keep the first
+    records = list({record.hit.url: record for record in reversed(state.get("summaries", []))}.values())
+    records.reverse()
+    # Fan-out near-duplicates become extra sources of their representative
+    records = fold_duplicates(records)
+
+    # Group Summaries
+    grouped_content, unknown_bucket = group_by_company(records, target_names)
+
+    if NEWSLETTER_PROFILES:
+        reports = await write_profile_reports(grouped_content, unknown_bucket, today)
+        return {"profile_reports": reports, "steps": 1}
+
+    if CONFIG["editor_mode"] == "mapreduce":
+        # Non-target news is out of scope for the report, so it is not sent at all
+        newsletter = await write_newsletter_mapreduce(grouped_content, today)
+    else:
+        newsletter = await write_newsletter(grouped_content, unknown_bucket, today, target_names)
+
+    return {"final_report": render_newsletter(newsletter, today), "steps": 1}
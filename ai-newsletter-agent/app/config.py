@@ -1,3 +1,4 @@
+import json
 import os
 from typing import List, TypedDict
 
@@ -10,10 +11,77 @@ load_dotenv()
 CONFIG = {
     "days_back": 3,
     "max_search_results": 5,
-    "rate_limit_delay": 2.0,
     "search_depth": "basic",
+    # Tavily rate limit (token bucket): requests/sec, burst size and max in-flight requests
+    "search_requests_per_second": 2.0,
+    "search_burst": 2,
+    "search_max_in_flight": 5,
     "min_search_score": 0.4,
+    # "per_company" (one query per target) or "consolidated" (several targets per query, hits
+    # routed to companies by keyword; linear mode only)
+    "search_mode": os.environ.get("SEARCH_MODE", "per_company"),
+    "companies_per_query": 4,
+    "consolidated_max_results": 20,
+    # Consolidated mode: targets no broad query mentioned get their own per-company query
+    "consolidated_fallback": True,
     "max_concurrency": 5,
+    # LLM calls use an adaptive (AIMD) limit: starts at max_concurrency, moves within these bounds
+    "llm_min_concurrency": 1,
+    "llm_max_concurrency": 32,
+    "llm_max_retries": 3,
+    # "interactive" (one call per article) or "batch" (one Message Batch per run, linear mode only)
+    "summarize_mode": os.environ.get("SUMMARIZE_MODE", "interactive"),
+    # Runs with fewer uncached articles than this stay interactive (a batch adds minutes of latency)
+    "batch_min_articles": 10,
+    "batch_poll_seconds": 30,
+    "batch_timeout_minutes": 60,
+    # Summarizer input budget per run (tokens), spread across articles by score and company coverage
+    "run_input_token_budget": 120_000,
+    # Per-article ceiling (replaces the old 20,000-character cut)
+    "article_max_tokens": 5_000,
+    # Articles whose estimated shingle overlap (Jaccard) reaches this are one story
+    "dedup_threshold": 0.8,
+    # "single" (one Newsletter call) or "mapreduce" (one call per company section + a summary call)
+    "editor_mode": os.environ.get("EDITOR_MODE", "single"),
+    # Safety limit on articles scraped per run (linear mode)
+    "max_articles": 36,
+    # "linear" (stage barriers) or "fanout" (independent search->scrape->summarize per company)
+    "graph_mode": os.environ.get("GRAPH_MODE", "linear"),
+    # Shared Playwright pool for the browser fallback
+    "browser_max_contexts": 3,
+    "browser_pages_per_context": 10,
+    # Pooled async HTTP client for the static scrape path
+    "http_max_connections": 50,
+    "http_per_host_limit": 4,
+    "http_connect_timeout": 5.0,
+    "http_read_timeout": 15.0,
+    "http_total_timeout": 30.0,
+    "http_max_body_mb": 5,
+    # Process pool for HTML extraction (0 = run in a thread instead)
+    "extract_workers": min(4, os.cpu_count() or 1),
+    "extract_timeout": 20.0,
+    "extract_max_tasks_per_child": 50,
+    # On-disk caches (shared across runs)
+    "cache_dir": "cache",
+    "scrape_cache_ttl_hours": 24,
+    "scrape_cache_max_mb": 200,
+    # Raw Tavily responses: fresh for the TTL, then served stale (and refreshed in the background)
+    "search_cache_ttl_hours": 6,
+    "search_cache_stale_hours": 24,
+    # Cross-run dedup: URLs processed within this many days are not selected again
+    "seen_url_ttl_days": 14,
+    # Item-level progress of unfinished runs (for `--resume`) is kept this long
+    "checkpoint_ttl_days": 7,
+    # Service mode (app/daemon.py): poll interval and daily publish time (local, HH:MM)
+    "daemon_poll_minutes": 30,
+    "daemon_publish_at": os.environ.get("DAEMON_PUBLISH_AT", "07:00"),
+    # Each poll looks back this far before the previous one: Tavily indexes some hits late and some
+    # only carry a date; repeats are dropped by the pending/seen URLs and the top-2 cap at publish
+    "daemon_poll_overlap_hours": 24,
+    # Email delivery: parallel SMTP connections (each reused across recipients), retries per recipient
+    "email_max_connections": 3,
+    "email_max_retries": 3,
+    "email_timeout": 30.0,
 }
 
 # --- Email Settings ---
@@ -22,6 +90,8 @@ SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
 EMAIL_SENDER = os.environ.get("EMAIL_SENDER")
 EMAIL_PASSWORD = os.environ.get("EMAIL_PASSWORD")
 EMAIL_RECIPIENT = os.environ.get("EMAIL_RECIPIENT")
+# EMAIL_RECIPIENT may hold several comma-separated addresses
+EMAIL_RECIPIENTS = [r.strip() for r in (EMAIL_RECIPIENT or "").split(",") if r.strip()]
 # Fallback to sender if username is not explicitly set
 SMTP_USERNAME = os.environ.get("SMTP_USERNAME") or EMAIL_SENDER
 
@@ -396,3 +466,28 @@ TARGET_COMPANIES: List[TargetCompany] = [
 #         ],
 #     },
 # ]
+
+
+# --- Newsletter Profiles ---
+class NewsletterProfile(TypedDict, total=False):
+    name: str
+    # Names from TARGET_COMPANIES covered by this segment
+    companies: List[str]
+    # Defaults to EMAIL_RECIPIENTS when omitted
+    recipients: List[str]
+
+
+# Optional JSON file with a list of subscriber segments
+PROFILES_FILE = os.environ.get("NEWSLETTER_PROFILES")
+# Empty: one newsletter over all TARGET_COMPANIES (default)
+NEWSLETTER_PROFILES: List[NewsletterProfile] = []
+if PROFILES_FILE:
+    with open(PROFILES_FILE, encoding="utf-8") as f:
+        NEWSLETTER_PROFILES = json.load(f)
+
+    # Search/scrape/summarize run once over the union of the profiles' companies
+    _known = {t["name"] for t in TARGET_COMPANIES}
+    _wanted = {name for profile in NEWSLETTER_PROFILES for name in profile["companies"]}
+    if _wanted - _known:
+        raise ValueError(f"Unknown companies in {PROFILES_FILE}: {sorted(_wanted - _known)}")
+    TARGET_COMPANIES = [t for t in TARGET_COMPANIES if t["name"] in _wanted]
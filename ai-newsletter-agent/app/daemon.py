@@ -0,0 +1,202 @@
+"""
+Resident service mode.
+
+Stays up between issues so imports, LLM/Tavily clients, the HTTP and browser pools,
+extraction workers and caches stay warm. Every `daemon_poll_minutes` it runs the pipeline
+without the Editor over only the window since the previous poll (already processed URLs are
+skipped by the seen-URL store) and adds the new summaries to the pending issue. At
+`daemon_publish_at` the pending summaries go through the Editor alone, so publishing takes
+about one editor call.
+
+Usage (from the ai-newsletter-agent directory):
+    python -m app.daemon
+    kill -USR1 <pid>    # publish the pending issue now
+"""
+
+import argparse
+import asyncio
+import datetime
+import signal
+from typing import Dict, List, Optional
+
+from app.agent.graph import build_workflow
+from app.agent.nodes import MIN_DATE, editor_writer
+from app.config import CONFIG
+from app.publish import publish, write_run_report
+from app.schemas import SummaryRecord
+from app.services.browser import browser_pool
+from app.services.cache import search_cache
+from app.services.checkpoint import run_progress
+from app.services.extraction import extraction_executor
+from app.services.fetcher import http_fetcher
+from app.services.search import wait_for_revalidations
+from app.telemetry import telemetry
+
+# The pending issue survives restarts in the run-progress store under this id
+DAEMON_RUN_ID = "daemon"
+
+
+class NewsletterDaemon:
+    def __init__(self, poll_minutes: float, publish_at: str):
+        self.poll_interval = datetime.timedelta(minutes=poll_minutes)
+        self.publish_at = datetime.time.fromisoformat(publish_at)
+        # First retry delay after a failed publish (doubles per failure)
+        self.publish_retry_seconds = 60.0
+        self.ingest_app = build_workflow(CONFIG["graph_mode"], with_editor=False).compile()
+        # Polls within one day share a search window; every poll must see fresh results
+        search_cache.ttl_seconds = min(search_cache.ttl_seconds, self.poll_interval.total_seconds() / 2)
+        search_cache.stale_seconds = 0
+        self.pending: Dict[str, SummaryRecord] = {}
+        self.last_poll: Optional[datetime.datetime] = None
+        self.publish_requested = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    def restore(self):
+        """Reloads the pending issue and the last poll time after a restart."""
+        self.pending = {
+            url: SummaryRecord.model_validate_json(payload)
+            for url, payload in run_progress.load(DAEMON_RUN_ID, "pending").items()
+        }
+        last_poll = run_progress.load(DAEMON_RUN_ID, "state").get("last_poll")
+        self.last_poll = datetime.datetime.fromisoformat(last_poll) if last_poll else None
+        if self.pending:
+            print(f" Restored {len(self.pending)} pending summaries (last poll: {last_poll}).")
+
+    def next_publish(self, now: datetime.datetime) -> datetime.datetime:
+        publish_time = datetime.datetime.combine(now.date(), self.publish_at, tzinfo=now.tzinfo)
+        return publish_time if publish_time > now else publish_time + datetime.timedelta(days=1)
+
+    async def poll(self):
+        """Searches, scrapes and summarizes only what appeared since the last poll."""
+        started = datetime.datetime.now(datetime.timezone.utc)
+        since = self.last_poll.isoformat() if self.last_poll else None
+        window = since or f"the last {CONFIG['days_back']} days"
+        print(f"\n [Daemon] Polling news since {window}")
+
+        state = await self.ingest_app.ainvoke(
+            {
+                "search_results": [],
+                "scraped_articles": [],
+                "unique_articles": [],
+                "summaries": [],
+                # Pending stories are only marked as seen once the issue is published
+                "seen_urls": list(self.pending),
+                "final_report": "",
+                "profile_reports": {},
+                "steps": 0,
+                "search_since": since,
+            }
+        )
+        for record in state.get("summaries", []):
+            self.pending[record.hit.url] = record
+            run_progress.save(DAEMON_RUN_ID, "pending", record.hit.url, record.model_dump_json())
+
+        self.last_poll = started
+        run_progress.save(DAEMON_RUN_ID, "state", "last_poll", started.isoformat())
+        print(f" [Daemon] +{len(state.get('summaries', []))} summaries, {len(self.pending)} pending for the next issue.")
+
+    def issue_summaries(self) -> List[SummaryRecord]:
+        """Pending summaries capped like a single run: the top 2 per company by score, then date."""
+        by_company: Dict[str, List[SummaryRecord]] = {}
+        for record in self.pending.values():
+            by_company.setdefault(record.hit.company, []).append(record)
+        selected = []
+        for records in by_company.values():
+            records.sort(key=lambda r: (r.hit.score, r.hit.published or MIN_DATE), reverse=True)
+            selected.extend(records[:2])
+        return selected
+
+    async def publish(self):
+        """Runs only the Editor over the pending summaries, then saves and sends the issue."""
+        if not self.pending:
+            print("\n [Daemon] Nothing new to publish.")
+            return
+        started = asyncio.get_running_loop().time()
+        summaries = self.issue_summaries()
+        if len(summaries) < len(self.pending):
+            print(f" [Daemon] Keeping the top 2 per company: {len(summaries)} of {len(self.pending)} summaries.")
+        update = await editor_writer({"summaries": summaries})
+        filename = await publish({**update, "summaries": summaries})
+        write_run_report(filename)
+        print(f" [Daemon] Published {len(summaries)} summaries in {asyncio.get_running_loop().time() - started:.1f}s.")
+
+        # Next issue starts empty; the run report covers the polls since the previous issue
+        self.pending.clear()
+        run_progress.clear(DAEMON_RUN_ID)
+        if self.last_poll:
+            run_progress.save(DAEMON_RUN_ID, "state", "last_poll", self.last_poll.isoformat())
+        telemetry.reset()
+
+    async def _wait(self, seconds: float):
+        """Sleeps until the timeout, a publish request or shutdown."""
+        waiters = [asyncio.ensure_future(self.publish_requested.wait()), asyncio.ensure_future(self.stopping.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=max(seconds, 0), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def run(self):
+        self.restore()
+        telemetry.reset()
+        now = datetime.datetime.now().astimezone()
+        next_poll = now
+        next_publish = self.next_publish(now)
+        print(f" [Daemon] Polling every {self.poll_interval}, publishing daily at {self.publish_at}.")
+
+        publish_failures = 0
+        while not self.stopping.is_set():
+            now = datetime.datetime.now().astimezone()
+            if self.publish_requested.is_set() or now >= next_publish:
+                self.publish_requested.clear()
+                try:
+                    # Only the Editor runs here: pending summaries are at most one poll interval old
+                    await self.publish()
+                    publish_failures = 0
+                    next_publish = self.next_publish(datetime.datetime.now().astimezone())
+                    next_poll = datetime.datetime.now().astimezone() + self.poll_interval
+                except Exception as e:
+                    # The pending issue is kept; retry with exponential backoff, capped at the poll interval
+                    publish_failures += 1
+                    backoff = min(
+                        self.publish_retry_seconds * 2 ** (publish_failures - 1), self.poll_interval.total_seconds()
+                    )
+                    print(f" [Daemon] x Publish failed ({e.__class__.__name__}: {e}), retrying in {backoff:.0f}s")
+                    next_publish = datetime.datetime.now().astimezone() + datetime.timedelta(seconds=backoff)
+            elif now >= next_poll:
+                try:
+                    await self.poll()
+                except Exception as e:
+                    # A failed poll is retried at the next tick
+                    print(f" [Daemon] x {e.__class__.__name__}: {e}")
+                next_poll = datetime.datetime.now().astimezone() + self.poll_interval
+
+            wake_at = min(next_poll, next_publish)
+            await self._wait((wake_at - datetime.datetime.now().astimezone()).total_seconds())
+
+
+async def main(publish_now: bool = False):
+    daemon = NewsletterDaemon(CONFIG["daemon_poll_minutes"], CONFIG["daemon_publish_at"])
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGUSR1, daemon.publish_requested.set)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, daemon.stopping.set)
+    if publish_now:
+        daemon.publish_requested.set()
+
+    try:
+        await daemon.run()
+    finally:
+        # The pools stay open for the daemon's whole life
+        await wait_for_revalidations()
+        await browser_pool.close()
+        await http_fetcher.close()
+        extraction_executor.close()
+        print(" [Daemon] Stopped.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="AI Newsletter Agent (resident service mode)")
+    arg_parser.add_argument("--publish-now", action="store_true", help="Publish the pending issue right after start")
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.publish_now))
@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+import os
+import re
+from typing import List, Optional, Tuple
+
+from app.config import NEWSLETTER_PROFILES
+from app.services.email import send_email
+from app.services.history import seen_store
+from app.telemetry import telemetry
+
+OUTPUT_DIR = "output"
+
+
+def report_path(date_str: str, profile: Optional[str] = None) -> str:
+    if profile is None:
+        return os.path.join(OUTPUT_DIR, f"AI_Newsletter_{date_str}.md")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", profile).strip("_")
+    return os.path.join(OUTPUT_DIR, f"AI_Newsletter_{date_str}_{slug}.md")
+
+
+def collect_reports(final_state: dict, date_str: str) -> List[Tuple[str, str, Optional[List[str]]]]:
+    """
+    (file path, report, recipients) for every report in the final graph state:
+    one per profile if NEWSLETTER_PROFILES produced any, else the single report.
+    `recipients` None means the default EMAIL_RECIPIENT list.
+    """
+    profile_reports = final_state.get("profile_reports") or {}
+    if profile_reports:
+        recipients = {p["name"]: p.get("recipients") for p in NEWSLETTER_PROFILES}
+        return [(report_path(date_str, name), report, recipients.get(name)) for name, report in profile_reports.items()]
+    report = final_state.get("final_report") or "No report generated."
+    return [(report_path(date_str), report, None)]
+
+
+def saved_reports(date_str: str) -> List[Tuple[str, Optional[List[str]]]]:
+    """
+    (file path, recipients) of the reports already saved for `date_str`, mirroring `collect_reports`.
+    """
+    if NEWSLETTER_PROFILES:
+        candidates = [(report_path(date_str, p["name"]), p.get("recipients")) for p in NEWSLETTER_PROFILES]
+    else:
+        candidates = [(report_path(date_str), None)]
+    return [(path, recipients) for path, recipients in candidates if os.path.exists(path)]
+
+
+def remember_published(records):
+    """
+    Marks the URLs of a published issue as seen so later runs skip them.
+    Only done after the reports are saved, so a failed Editor run or publish can simply be rerun.
+    """
+    try:
+        seen_store.mark(
+            (url for record in records for url in [record.hit.url] + [hit.url for hit in record.duplicates]),
+            status="published",
+        )
+    except Exception as e:
+        print(f"      x Could not update seen-URL store: {e}")
+
+
+async def publish(final_state: dict, send: bool = True) -> str:
+    """
+    Saves every report to `output/` and emails each to its recipients (concurrently).
+    Returns the path of the main report, which also names the run report.
+    """
+    date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    deliveries = []
+    for path, report, recipients in collect_reports(final_state, date_str):
+        # Save locally
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"\n Report saved to: {path}")
+        if send:
+            deliveries.append(send_email(report, recipients))
+    remember_published(final_state.get("summaries", []))
+
+    # Send via Email
+    with telemetry.stage("email"):
+        for result in await asyncio.gather(*deliveries, return_exceptions=True):
+            if isinstance(result, Exception):
+                print(f"Failed to send email: {result}")
+
+    return report_path(date_str)
+
+
+def write_run_report(filename: str):
+    """Machine-readable run report next to the markdown, plus the prompt cache summary."""
+    run_report = telemetry.write(filename.replace(".md", ".run.json"))
+    print(f" Run report saved to: {run_report}")
+    for label, stats in telemetry.to_dict()["prompt_cache"].items():
+        rate = f"{stats['cache_hit_rate']:.0%}" if stats["cache_hit_rate"] is not None else "n/a"
+        print(f"   [{label}] prompt cache hit rate: {rate} over {stats['calls']} calls")
@@ -1,5 +1,6 @@
+import datetime
 import re
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -36,3 +37,41 @@ class Newsletter(BaseModel):
         description="List of summary bullet points, one per company"
     )
     company_reports: List[CompanySection] = Field(description="Detailed reports for each company")
+
+
+class ExecutiveSummary(BaseModel):
+    executive_summary: List[str] = Field(
+        description="List of summary bullet points, one per company"
+    )
+
+
+# --- Pipeline Records ---
+# Typed payloads passed between graph nodes (no string round-trips).
+
+
+class SearchHit(BaseModel):
+    company: str
+    url: str
+    title: str = ""
+    score: float = 0.0
+    published: Optional[datetime.datetime] = None
+
+    @property
+    def date_display(self) -> str:
+        return self.published.strftime("%Y-%m-%d") if self.published else "Unknown Date"
+
+
+class Article(BaseModel):
+    hit: SearchHit
+    content: str
+    # Near-identical copies found elsewhere (same story, other outlets)
+    duplicates: List[SearchHit] = []
+
+
+class SummaryRecord(BaseModel):
+    hit: SearchHit
+    summary: ArticleSummary
+    # Extra sources reporting the same story
+    duplicates: List[SearchHit] = []
+    # Fan-out only: URL of the representative this record's summary was taken from
+    duplicate_of: Optional[str] = None
@@ -0,0 +1,154 @@
+"""
+Message Batches summarization.
+
+Submits all articles of a run as ONE Anthropic Message Batch instead of one interactive
+call per article. A batch takes minutes (up to 24h) to complete, but costs half as much
+and is not subject to the per-minute rate limits, so it suits backfills and large target lists.
+"""
+
+import asyncio
+import functools
+import time
+from typing import Dict, Optional
+
+from app.config import CONFIG
+from app.schemas import ArticleSummary
+from app.services.llm import CACHE_CONTROL, llm_fast
+from app.telemetry import UsageCapture, telemetry
+
+
+@functools.lru_cache(maxsize=1)
+def summary_tool() -> dict:
+    """Same tool the interactive `article_summarizer` forces."""
+    from langchain_anthropic.chat_models import convert_to_anthropic_tool
+
+    return convert_to_anthropic_tool(ArticleSummary)
+
+
+class BatchSummarizer:
+    """
+    Summarizes many articles with a single Message Batch.
+
+    `client` is any object exposing the `AsyncAnthropic().messages.batches` API
+    (create / retrieve / results / cancel), so a local fake endpoint can be used
+    by passing `anthropic.AsyncAnthropic(base_url=...)`.
+    """
+
+    def __init__(self, client=None, poll_interval: float = 30.0, timeout: float = 3600.0):
+        self._client = client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    @property
+    def client(self):
+        if self._client is None:
+            import anthropic
+
+            self._client = anthropic.AsyncAnthropic(max_retries=CONFIG["llm_max_retries"])
+        return self._client
+
+    @staticmethod
+    def build_request(custom_id: str, system: str, user: str) -> dict:
+        """One batch entry, mirroring the interactive summarizer call."""
+        model, tool = llm_fast.get(), summary_tool()
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": model.model,
+                "max_tokens": model.max_tokens,
+                "temperature": model.temperature,
+                # Same breakpoint as the interactive path: batch items share the cached prefix too
+                "system": [{"type": "text", "text": system, "cache_control": CACHE_CONTROL}],
+                "messages": [{"role": "user", "content": user}],
+                "tools": [tool],
+                "tool_choice": {"type": "tool", "name": tool["name"]},
+            },
+        }
+
+    @staticmethod
+    def parse_result(entry) -> Optional[ArticleSummary]:
+        """Maps one batch result to an ArticleSummary (None if errored, expired or invalid)."""
+        if entry.result.type != "succeeded":
+            return None
+        for block in entry.result.message.content:
+            if block.type == "tool_use" and block.name == summary_tool()["name"]:
+                try:
+                    return ArticleSummary.model_validate(block.input)
+                except Exception:
+                    return None
+        return None
+
+    async def cancel(self, batch_id: str):
+        """Best-effort cancel, so an abandoned batch stops processing (and billing)."""
+        try:
+            await self.client.messages.batches.cancel(batch_id)
+        except Exception as e:
+            print(f"      x Could not cancel batch {batch_id}: {e}")
+
+    async def wait(self, batch_id: str):
+        """Polls until the batch has ended. Cancels it and returns None on timeout."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            batch = await self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                return batch
+            if time.monotonic() >= deadline:
+                print(f"      x Batch {batch_id} still running after {self.timeout:.0f}s. Cancelling...")
+                await self.cancel(batch_id)
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def summarize(self, system: str, items: Dict[str, str]) -> Dict[str, ArticleSummary]:
+        """
+        Summarizes `items` (custom_id -> user message) with the shared `system` prompt.
+        Returns the summaries that succeeded, keyed by custom_id; the caller retries the rest.
+        """
+        if not items:
+            return {}
+
+        start = time.perf_counter()
+        requests = [self.build_request(custom_id, system, user) for custom_id, user in items.items()]
+        batch = None
+        try:
+            batch = await self.client.messages.batches.create(requests=requests)
+            print(f"   -> Submitted batch {batch.id} ({len(requests)} articles). Waiting for results...")
+            ended = await self.wait(batch.id)
+            if ended is None:
+                telemetry.llm_call("summarize_batch", time.perf_counter() - start, None, 0, ok=False)
+                return {}
+            batch = ended
+
+            usage = UsageCapture()
+            summaries = {}
+            async for entry in await self.client.messages.batches.results(batch.id):
+                if entry.result.type == "succeeded":
+                    tokens = entry.result.message.usage
+                    cache_read = getattr(tokens, "cache_read_input_tokens", 0) or 0
+                    cache_creation = getattr(tokens, "cache_creation_input_tokens", 0) or 0
+                    # Raw API input_tokens exclude cached tokens; count totals like LangChain does
+                    usage.input_tokens += tokens.input_tokens + cache_read + cache_creation
+                    usage.output_tokens += tokens.output_tokens
+                    usage.cache_read_tokens += cache_read
+                    usage.cache_creation_tokens += cache_creation
+                summary = self.parse_result(entry)
+                if summary is not None and entry.custom_id in items:
+                    summaries[entry.custom_id] = summary
+        except Exception as e:
+            print(f"      x Batch summarization failed: {e}")
+            # The caller re-summarizes every item interactively; don't pay for the batch as well
+            if batch is not None and batch.processing_status != "ended":
+                await self.cancel(batch.id)
+            telemetry.llm_call("summarize_batch", time.perf_counter() - start, None, 0, ok=False)
+            return {}
+
+        telemetry.llm_call("summarize_batch", time.perf_counter() - start, usage, 0, ok=True)
+        telemetry.count("batch_items", len(items))
+        telemetry.count("batch_fallbacks", len(items) - len(summaries))
+        return summaries
+
+
+# Shared instance; swap `batch_summarizer` (or its client) to target another endpoint
+batch_summarizer = BatchSummarizer(
+    poll_interval=CONFIG["batch_poll_seconds"],
+    timeout=CONFIG["batch_timeout_minutes"] * 60,
+)
@@ -0,0 +1,161 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.config import CONFIG
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+async def apply_stealth_async(target):
+    """
+    Async stealth injection.
+    Works on a page or on a whole context (scripts then run on every page it opens).
+    """
+    await target.add_init_script(
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+    )
+    await target.add_init_script("window.chrome = {runtime: {}};")
+    await target.add_init_script(
+        "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
+    )
+    await target.add_init_script(
+        "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});"
+    )
+
+
+class BrowserPool:
+    """
+    Shared headless Chromium for the browser fallback path.
+
+    - The browser is launched lazily on first use and reused until close().
+    - At most `max_contexts` stealthed contexts exist; each serves one page at a time.
+    - A context is recycled after `pages_per_context` pages to keep memory flat.
+    - A crashed/disconnected browser is relaunched on the next request.
+    """
+
+    def __init__(self, max_contexts: int = 3, pages_per_context: int = 10):
+        self.max_contexts = max_contexts
+        self.pages_per_context = pages_per_context
+        self._playwright = None
+        self._browser = None
+        self._idle = []  # [(context, pages_served)]
+        self._slots = None
+        self._lock = None
+        self._loop = None
+
+    def _ensure_primitives(self):
+        # Playwright objects and asyncio primitives are bound to one event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._playwright = None
+            self._browser = None
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.max_contexts)
+            self._lock = asyncio.Lock()
+
+    async def _get_browser(self):
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                print("      x Browser crashed/disconnected. Relaunching...")
+                # Contexts of a dead browser are unusable
+                self._idle = []
+
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch(
+                headless=True, args=["--disable-blink-features=AutomationControlled"]
+            )
+            return self._browser
+
+    async def _new_context(self):
+        browser = await self._get_browser()
+        context = await browser.new_context(
+            user_agent=USER_AGENT,
+            locale="en-US",
+            timezone_id="America/New_York",
+        )
+        await apply_stealth_async(context)
+        return context
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Hands out a fresh page from a pooled, pre-stealthed context.
+        """
+        self._ensure_primitives()
+        async with self._slots:
+            context, served = None, 0
+            # Reuse an idle context if its browser is still alive
+            while self._idle:
+                candidate, candidate_served = self._idle.pop()
+                if candidate.browser and candidate.browser.is_connected():
+                    context, served = candidate, candidate_served
+                    break
+
+            if context is None:
+                context = await self._new_context()
+
+            page = None
+            healthy = False
+            try:
+                page = await context.new_page()
+                yield page
+                healthy = True
+            finally:
+                served += 1
+                try:
+                    if page is not None:
+                        await page.close()
+                except Exception:
+                    healthy = False
+
+                # Recycle worn-out or broken contexts, keep the rest warm
+                if healthy and served < self.pages_per_context:
+                    self._idle.append((context, served))
+                else:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+
+    async def close(self):
+        """
+        Shuts down all contexts, the browser and the Playwright driver.
+        """
+        for context, _ in self._idle:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._idle = []
+
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+# Shared pool for the whole process (one run, or the daemon lifetime)
+browser_pool = BrowserPool(
+    max_contexts=CONFIG["browser_max_contexts"],
+    pages_per_context=CONFIG["browser_pages_per_context"],
+)
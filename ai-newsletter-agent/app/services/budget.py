@@ -0,0 +1,174 @@
+"""
+Run-wide input-token budget for the Summarizer.
+
+The run budget (`run_input_token_budget`) is first split evenly across the companies that
+have articles (coverage), then across each company's articles by search score. Shares an
+article does not need are handed to the others. Each article is then trimmed to its share by
+keeping the paragraphs densest in its company's keywords, in their original order.
+"""
+
+import functools
+import re
+import threading
+from typing import Dict, List, Sequence
+
+from app.config import CONFIG
+from app.schemas import Article
+from app.services.matcher import company_matcher
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Claude's tokenizer is not published; cl100k_base tracks it closely for English prose
+TOKENIZER_ENCODING = "cl100k_base"
+# Fallback when tiktoken (or its encoding file) is unavailable
+CHARS_PER_TOKEN = 4
+
+TRIM_MARKER = "[...]"
+
+_encoding_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_encoding():
+    """The tokenizer, or None (warned once per process) when token counts are estimated."""
+    if tiktoken is None:
+        print("Warning: tiktoken is not installed, token budgets are estimated from text length.")
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        # The encoding is downloaded on first use; offline hosts need it in TIKTOKEN_CACHE_DIR
+        print(
+            f"Warning: tokenizer '{TOKENIZER_ENCODING}' unavailable ({e.__class__.__name__}), "
+            "token budgets are estimated from text length."
+        )
+        return None
+
+
+def _get_encoding():
+    # The budget runs in worker threads; load (and warn) only once
+    with _encoding_lock:
+        return _load_encoding()
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` to at most `max_tokens` tokens."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def allocate(needs: Sequence[int], weights: Sequence[float], budget: int) -> List[int]:
+    """
+    Splits `budget` proportionally to `weights`, never giving an item more than it `needs`.
+    Whatever a capped item leaves over is redistributed to the rest (water-filling).
+    """
+    shares = [0] * len(needs)
+    open_items = [i for i, need in enumerate(needs) if need > 0]
+    remaining = budget
+    while open_items and remaining > 0:
+        total_weight = sum(weights[i] for i in open_items)
+        offers = {i: remaining * weights[i] / total_weight for i in open_items}
+        capped = [i for i in open_items if offers[i] >= needs[i]]
+        if not capped:
+            # Nobody is saturated: hand out the rest proportionally
+            for i in open_items:
+                shares[i] = int(offers[i])
+            break
+        for i in capped:
+            shares[i] = needs[i]
+            remaining -= needs[i]
+        open_items = [i for i in open_items if i not in capped]
+    return shares
+
+
+def article_weights(articles: Sequence[Article]) -> List[float]:
+    """
+    Priority of each article: every company gets an equal share of the run (coverage),
+    split between its articles by search score.
+    """
+    by_company: Dict[str, float] = {}
+    for article in articles:
+        by_company[article.hit.company] = by_company.get(article.hit.company, 0.0) + max(article.hit.score, 0.01)
+    return [max(a.hit.score, 0.01) / by_company[a.hit.company] / len(by_company) for a in articles]
+
+
+def keyword_density(paragraph: str, company: str, tokens: int) -> float:
+    return company_matcher.count(paragraph).get(company, 0) / max(tokens, 1)
+
+
+def trim_to_tokens(content: str, company: str, max_tokens: int) -> str:
+    """
+    Keeps the paragraphs densest in `company`'s keywords that fit in `max_tokens`, in document order.
+    The lead paragraph is considered first; gaps are marked with `[...]`.
+    """
+    if count_tokens(content) <= max_tokens:
+        return content
+
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", content) if p.strip()]
+    costs = [count_tokens(p) for p in paragraphs]
+    # Lead first, then by density (ties keep document order)
+    order = [0] + sorted(
+        range(1, len(paragraphs)), key=lambda i: (-keyword_density(paragraphs[i], company, costs[i]), i)
+    )
+    marker_cost = count_tokens(TRIM_MARKER) + 1
+    kept, used = set(), 0
+    for i in order:
+        cost = costs[i] + marker_cost
+        if used + cost <= max_tokens:
+            kept.add(i)
+            used += cost
+
+    if not kept:
+        # A single oversized lead paragraph
+        return truncate_tokens(paragraphs[0], max(max_tokens - marker_cost, 0)) + f"\n\n{TRIM_MARKER}"
+
+    parts, previous = [], -1
+    for i in sorted(kept):
+        if i != previous + 1:
+            parts.append(TRIM_MARKER)
+        parts.append(paragraphs[i])
+        previous = i
+    if previous != len(paragraphs) - 1:
+        parts.append(TRIM_MARKER)
+    return "\n\n".join(parts)
+
+
+def apply_budget(articles: List[Article], budget: int) -> List[Article]:
+    """
+    Trims `articles` so their combined content fits in `budget` tokens.
+    Returns new Article objects; untouched articles are returned as-is.
+    """
+    if not articles:
+        return articles
+
+    max_tokens = CONFIG["article_max_tokens"]
+    sizes = [count_tokens(a.content) for a in articles]
+    needs = [min(size, max_tokens) for size in sizes]
+    shares = allocate(needs, article_weights(articles), budget)
+
+    trimmed = []
+    for article, size, share in zip(articles, sizes, shares):
+        if share >= size:
+            trimmed.append(article)
+            continue
+        content = trim_to_tokens(article.content, article.hit.company, share)
+        trimmed.append(article.model_copy(update={"content": content}))
+    print(
+        f"   -> Token budget: {sum(sizes)} -> {sum(min(size, share) for size, share in zip(sizes, shares))} "
+        f"input tokens across {len(articles)} articles (budget {budget})."
+    )
+    return trimmed
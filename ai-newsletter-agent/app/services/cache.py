@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.config import CONFIG
+from app.schemas import ArticleSummary
+
+# Query parameters that never change the article itself
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid", "ocid", "guccounter"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so trivially different links share one cache entry.
+    Lowercases scheme/host, drops fragments, tracking params and trailing slashes.
+    """
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), "")
+    )
+
+
+class SQLiteCache:
+    """
+    Base class for the small on-disk caches. One SQLite file per cache.
+    """
+
+    schema = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the disk
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(self.schema)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+@dataclass
+class ScrapeEntry:
+    url: str
+    content: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return time.time() - self.fetched_at < ttl_seconds
+
+
+class ScrapeCache(SQLiteCache):
+    """
+    Persistent cache of extracted article markdown, keyed by canonical URL.
+    Stores ETag/Last-Modified so stale entries can be revalidated with a conditional GET.
+    Bounded by total content size; least recently used entries are evicted first.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS scrape_cache (
+        url TEXT PRIMARY KEY,
+        content TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_scrape_cache_access ON scrape_cache(last_access);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def get(self, url: str) -> Optional[ScrapeEntry]:
+        key = canonicalize_url(url)
+        row = self.conn.execute(
+            "SELECT content, etag, last_modified, fetched_at FROM scrape_cache WHERE url = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE scrape_cache SET last_access = ? WHERE url = ?", (time.time(), key)
+            )
+        return ScrapeEntry(key, row[0], row[1], row[2], row[3])
+
+    def put(self, url: str, content: str, etag: str = None, last_modified: str = None):
+        key = canonicalize_url(url)
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache "
+                "(url, content, etag, last_modified, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, content, etag, last_modified, now, now, len(content.encode("utf-8"))),
+            )
+        self._evict()
+
+    def touch(self, url: str):
+        """Marks an entry as freshly revalidated (e.g. after a 304 Not Modified)."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE scrape_cache SET fetched_at = ?, last_access = ? WHERE url = ?",
+                (now, now, canonicalize_url(url)),
+            )
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM scrape_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until we are back under the limit
+        to_delete = []
+        for url, size in self.conn.execute(
+            "SELECT url, size FROM scrape_cache ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            to_delete.append((url,))
+            total -= size
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM scrape_cache WHERE url = ?", to_delete)
+
+
+def fingerprint(*parts: str) -> str:
+    """Stable SHA-256 hex digest over several strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SummaryCache(SQLiteCache):
+    """
+    Content-addressed cache of LLM article summaries.
+    The key covers the article text, the model name and the prompt version,
+    so changing any of them naturally invalidates old entries.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS summary_cache (
+        key TEXT PRIMARY KEY,
+        summary TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt: str) -> str:
+        return fingerprint(text, model, fingerprint(prompt))
+
+    def get(self, key: str) -> Optional[ArticleSummary]:
+        row = self.conn.execute("SELECT summary FROM summary_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ArticleSummary.model_validate_json(row[0])
+
+    def put(self, key: str, summary: ArticleSummary):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, summary, created_at) VALUES (?, ?, ?)",
+                (key, summary.model_dump_json(), time.time()),
+            )
+
+
+@dataclass
+class SearchEntry:
+    response: dict
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SearchCache(SQLiteCache):
+    """
+    Raw search responses, keyed by everything that shapes them: query, start date,
+    search depth, max results and excluded domains.
+    Entries are fresh for `ttl_seconds`; for `stale_seconds` after that they are still served
+    while a background refresh runs (stale-while-revalidate). In `replay` mode the latest stored
+    response per query is served whatever its age or start date, nothing is fetched and nothing
+    is pruned, so the filtering can be re-run offline on a later day.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS search_cache (
+        key TEXT PRIMARY KEY,
+        query TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        response TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_search_cache_fetched ON search_cache(fetched_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, stale_seconds: float):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.replay = False
+
+    @staticmethod
+    def make_key(query: str, start_date: str, depth: str, max_results: int, excluded: Iterable[str]) -> str:
+        return fingerprint(query, start_date, depth, str(max_results), ",".join(sorted(excluded)))
+
+    def get(self, key: str) -> Optional[SearchEntry]:
+        row = self.conn.execute("SELECT response, fetched_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return SearchEntry(json.loads(row[0]), row[1])
+
+    def latest(self, query: str) -> Optional[SearchEntry]:
+        """Most recently fetched response for `query`, whatever its start date (replay)."""
+        row = self.conn.execute(
+            "SELECT response, fetched_at FROM search_cache WHERE query = ? ORDER BY fetched_at DESC LIMIT 1",
+            (query,),
+        ).fetchone()
+        if row is None:
+            return None
+        return SearchEntry(json.loads(row[0]), row[1])
+
+    def last_fetched(self) -> Optional[float]:
+        """When the most recent response was recorded (replay filters dates as of this time)."""
+        return self.conn.execute("SELECT MAX(fetched_at) FROM search_cache").fetchone()[0]
+
+    def put(self, key: str, query: str, start_date: str, response: dict):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, start_date, response, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, query, start_date, json.dumps(response), time.time()),
+            )
+
+    def prune(self):
+        """Drops entries too old to be served even stale (never in replay mode, which serves any age)."""
+        if self.replay:
+            return
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM search_cache WHERE fetched_at < ?", (time.time() - self.ttl_seconds - self.stale_seconds,)
+            )
+
+
+scrape_cache = ScrapeCache(
+    os.path.join(CONFIG["cache_dir"], "scrape.sqlite"),
+    ttl_seconds=CONFIG["scrape_cache_ttl_hours"] * 3600,
+    max_bytes=CONFIG["scrape_cache_max_mb"] * 1024 * 1024,
+)
+
+summary_cache = SummaryCache(os.path.join(CONFIG["cache_dir"], "summaries.sqlite"))
+
+search_cache = SearchCache(
+    os.path.join(CONFIG["cache_dir"], "search.sqlite"),
+    ttl_seconds=CONFIG["search_cache_ttl_hours"] * 3600,
+    stale_seconds=CONFIG["search_cache_stale_hours"] * 3600,
+)
@@ -0,0 +1,95 @@
+"""
+Durable, resumable runs.
+
+- Node level: the graph is compiled with a SQLite checkpointer (LangGraph `AsyncSqliteSaver`),
+  one thread per run id. Resuming a run re-executes only the nodes that did not finish.
+- Item level: `scraper_node` and `summarize_node` record every finished article in `run_progress`,
+  so a node interrupted halfway only redoes the missing articles when it is resumed.
+"""
+
+import contextlib
+import os
+import time
+from typing import Dict, Optional
+
+from app.config import CONFIG
+from app.services.cache import SQLiteCache
+
+CHECKPOINT_PATH = os.path.join(CONFIG["cache_dir"], "checkpoints.sqlite")
+
+# State types the checkpointer may rebuild from disk
+STATE_TYPES = [
+    ("app.schemas", "SearchHit"),
+    ("app.schemas", "Article"),
+    ("app.schemas", "ArticleSummary"),
+    ("app.schemas", "SummaryRecord"),
+]
+
+
+@contextlib.asynccontextmanager
+async def open_checkpointer(path: str = CHECKPOINT_PATH):
+    """Async SQLite checkpointer, open for the duration of the `async with` block."""
+    import aiosqlite
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    async with aiosqlite.connect(path) as conn:
+        yield AsyncSqliteSaver(conn, serde=JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES))
+
+
+def run_id_of(config: Optional[dict]) -> Optional[str]:
+    """The run id (checkpoint thread id) a node is executing under, if any."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+class RunProgress(SQLiteCache):
+    """
+    Per-run record of finished items (scraped articles, summaries) as JSON, keyed by URL.
+    Rows of completed runs are dropped; abandoned runs expire after `checkpoint_ttl_days`.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS run_items (
+        run_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        key TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (run_id, stage, key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_run_items_created ON run_items(created_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, run_id: str, stage: str) -> Dict[str, str]:
+        rows = self.conn.execute(
+            "SELECT key, payload FROM run_items WHERE run_id = ? AND stage = ?", (run_id, stage)
+        ).fetchall()
+        return dict(rows)
+
+    def save(self, run_id: str, stage: str, key: str, payload: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO run_items (run_id, stage, key, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, stage, key, payload, time.time()),
+            )
+
+    def clear(self, run_id: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM run_items WHERE run_id = ?", (run_id,))
+
+    def prune(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM run_items WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+
+run_progress = RunProgress(
+    os.path.join(CONFIG["cache_dir"], "run_progress.sqlite"),
+    ttl_seconds=CONFIG["checkpoint_ttl_days"] * 86400,
+)
@@ -0,0 +1,159 @@
+"""
+Near-duplicate detection for scraped articles.
+
+Syndicated copies of one story (wire reprints, lightly edited rewrites) are detected with
+MinHash signatures over word shingles, bucketed with LSH so each article is only compared
+with likely matches. One representative per cluster is summarized; the other copies ride
+along as extra sources for the Editor.
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas import Article, SummaryRecord
+
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+# Marks a signature slot no shingle hashed into (short texts)
+EMPTY = 2**64
+# LSH: 16 bands of 4 rows finds pairs above ~0.5 similarity with high probability
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text: str) -> Signature:
+    """
+    MinHash signature of the text's word shingles, computed with one-permutation hashing:
+    each shingle hash falls into one of NUM_PERM slots, which keep their minimum.
+    One hash per shingle instead of NUM_PERM.
+    """
+    signature = [EMPTY] * NUM_PERM
+    for shingle in shingles(text):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        slot, rank = value % NUM_PERM, value // NUM_PERM
+        if rank < signature[slot]:
+            signature[slot] = rank
+    return tuple(signature)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    matches = used = 0
+    for x, y in zip(a, b):
+        if x == EMPTY and y == EMPTY:
+            continue
+        used += 1
+        matches += x == y
+    return matches / used if used else 1.0
+
+
+class DuplicateIndex:
+    """
+    LSH index of MinHash signatures.
+    `query` returns the key of the most similar indexed item above `threshold`, if any.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.signatures: Dict[str, Signature] = {}
+        self._buckets: Dict[Tuple[int, Signature], List[str]] = {}
+
+    @staticmethod
+    def _bands(signature: Signature):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS : (band + 1) * ROWS]
+
+    def query(self, signature: Signature) -> Optional[str]:
+        candidates = {key for band in self._bands(signature) for key in self._buckets.get(band, [])}
+        best, best_score = None, self.threshold
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def add(self, key: str, signature: Signature):
+        self.signatures[key] = signature
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, []).append(key)
+
+
+def cluster_articles(articles: List[Article], threshold: float) -> List[Article]:
+    """
+    Groups near-identical articles. Returns one representative per cluster
+    (highest search score, then longest text) with the other copies in `duplicates`.
+    """
+    index = DuplicateIndex(threshold)
+    representatives: Dict[str, Article] = {}
+    ranked = sorted(articles, key=lambda a: (a.hit.score, len(a.content)), reverse=True)
+    for article in ranked:
+        signature = minhash(article.content)
+        match = index.query(signature)
+        if match is None:
+            index.add(article.hit.url, signature)
+            representatives[article.hit.url] = article.model_copy(update={"duplicates": list(article.duplicates)})
+        else:
+            representatives[match].duplicates.append(article.hit)
+    # Keep the incoming (per-company) order for the representatives
+    return [representatives[a.hit.url] for a in articles if a.hit.url in representatives]
+
+
+class ClusterRegistry:
+    """
+    Run-wide duplicate index for fan-out mode, where branches scrape independently.
+    The first branch to scrape a story claims it; branches scraping a near-duplicate
+    later wait for that summary instead of requesting their own.
+    """
+
+    def __init__(self, threshold: float):
+        self.index = DuplicateIndex(threshold)
+        self._summaries: Dict[str, asyncio.Future] = {}
+
+    def claim(self, article: Article) -> Optional[Tuple[str, asyncio.Future]]:
+        """None if the caller should summarize `article`, else (representative URL, its pending summary)."""
+        signature = minhash(article.content)
+        match = self.index.query(signature)
+        if match is not None:
+            return match, self._summaries[match]
+        self.index.add(article.hit.url, signature)
+        self._summaries[article.hit.url] = asyncio.get_running_loop().create_future()
+        return None
+
+    def resolve(self, url: str, record: Optional[SummaryRecord]):
+        future = self._summaries.get(url)
+        if future is not None and not future.done():
+            future.set_result(record)
+
+
+def fold_duplicates(records: List[SummaryRecord]) -> List[SummaryRecord]:
+    """
+    Attaches records marked `duplicate_of` to their representative as extra sources.
+    Orphans (representative missing) are kept as regular records.
+    """
+    by_url = {
+        record.hit.url: record.model_copy(update={"duplicates": list(record.duplicates)})
+        for record in records
+        if not record.duplicate_of
+    }
+    folded = []
+    for record in records:
+        if not record.duplicate_of:
+            folded.append(by_url[record.hit.url])
+            continue
+        representative = by_url.get(record.duplicate_of)
+        if representative is None:
+            folded.append(record)
+        elif all(hit.url != record.hit.url for hit in representative.duplicates):
+            representative.duplicates.append(record.hit)
+    return folded
@@ -1,31 +1,49 @@
-import smtplib
-import markdown
+import asyncio
 import datetime
-from email.mime.text import MIMEText
+import random
+import time
+from dataclasses import dataclass
 from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional
+
+import aiosmtplib
+import markdown
 from app.config import (
-    SMTP_SERVER,
-    SMTP_PORT,
-    SMTP_USERNAME,
+    CONFIG,
     EMAIL_PASSWORD,
+    EMAIL_RECIPIENTS,
     EMAIL_SENDER,
-    EMAIL_RECIPIENT,
+    SMTP_PORT,
+    SMTP_SERVER,
+    SMTP_USERNAME,
 )
+from app.telemetry import telemetry
 
+# Connection drops, timeouts and 4xx replies are worth another try
+TRANSIENT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
 
-def send_email(report_md: str):
-    """
-    Sends the Markdown report as an HTML email using SMTP.
-    """
-    if not SMTP_USERNAME or not EMAIL_PASSWORD or not EMAIL_RECIPIENT:
-        print("Email credentials missing. Skipping email send.")
-        return
 
-    print(f"\n Sending email to {EMAIL_RECIPIENT} via {SMTP_SERVER}...")
+@dataclass
+class DeliveryStatus:
+    recipient: str
+    ok: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+
 
-    try:
-        html_content = markdown.markdown(report_md)
-        styled_html = f"""
+def render_html(report_md: str) -> str:
+    """
+    Renders the Markdown report as the styled HTML email body (once per send).
+    """
+    html_content = markdown.markdown(report_md)
+    return f"""
         <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px;">
                 <div style="background-color: #f4f4f4; padding: 10px; text-align: center; border-radius: 5px;">
@@ -43,20 +61,172 @@ def send_email(report_md: str):
         </html>
         """
 
-        msg = MIMEMultipart()
-        msg["From"] = f"AI Newsletter <{EMAIL_SENDER}>"
-        msg["To"] = EMAIL_RECIPIENT
-        msg["Subject"] = (
-            f"AI Market Report: {datetime.datetime.now().strftime('%Y-%m-%d')}"
+
+def build_message(html: str, sender: str, recipient: str, subject: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = f"AI Newsletter <{sender}>"
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    msg.attach(MIMEText(html, "html"))
+    return msg
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(400 <= refused.code < 500 for refused in error.recipients)
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and 400 <= code < 500
+
+
+class EmailService:
+    """
+    Async SMTP delivery to a list of recipients.
+
+    - Up to `max_connections` connections, each authenticated once and reused for
+      every recipient it handles (no handshake per recipient).
+    - A dropped connection or a 4xx reply is retried with backoff on a fresh connection.
+    - Returns one DeliveryStatus per recipient.
+
+    Point `hostname`/`port` at a local stand-in (e.g. aiosmtpd) with `start_tls=False`
+    and no credentials to test without a real mail server.
+    """
+
+    def __init__(
+        self,
+        hostname: Optional[str],
+        port: int,
+        sender: Optional[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        use_tls: bool = False,
+        max_connections: int = 3,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.max_connections = max(1, max_connections)
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls and not self.use_tls,
+            timeout=self.timeout,
         )
-        msg.attach(MIMEText(styled_html, "html"))
+        await smtp.connect()
+        if self.username and self.password:
+            try:
+                await smtp.login(self.username, self.password)
+            except BaseException:
+                # The caller never receives this connection, so it cannot close it
+                await self._close(smtp)
+                raise
+        return smtp
+
+    @staticmethod
+    async def _close(smtp: Optional[aiosmtplib.SMTP]):
+        if smtp is None:
+            return
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _worker(self, queue: asyncio.Queue, html: str, subject: str, results: Dict[str, DeliveryStatus]):
+        """One connection, reused for every recipient this worker takes from the queue."""
+        smtp = None
+        try:
+            while not queue.empty():
+                recipient = queue.get_nowait()
+                status = results[recipient]
+                start = time.perf_counter()
+                for attempt in range(self.max_retries + 1):
+                    status.attempts += 1
+                    try:
+                        if smtp is None or not smtp.is_connected:
+                            smtp = await self._connect()
+                        await smtp.send_message(build_message(html, self.sender, recipient, subject))
+                        status.ok, status.error = True, None
+                        break
+                    except aiosmtplib.SMTPAuthenticationError as e:
+                        # Wrong credentials fail every recipient the same way: stop here
+                        status.error = f"authentication failed: {e}"
+                        while not queue.empty():
+                            results[queue.get_nowait()].error = status.error
+                        return
+                    except Exception as e:
+                        status.error = str(e)
+                        if attempt >= self.max_retries or not is_transient(e):
+                            break
+                        # Start over on a fresh connection after a short backoff
+                        await self._close(smtp)
+                        smtp = None
+                        await asyncio.sleep(min(10.0, 2**attempt) * random.uniform(0.5, 1.0))
+                telemetry.item(
+                    "email", recipient, time.perf_counter() - start, ok=status.ok, attempts=status.attempts
+                )
+        finally:
+            await self._close(smtp)
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, EMAIL_PASSWORD)
-            server.send_message(msg)
+    async def send(self, report_md: str, recipients: List[str]) -> List[DeliveryStatus]:
+        """
+        Sends the report to every recipient. Never raises; check the returned statuses.
+        """
+        html = render_html(report_md)
+        subject = f"AI Market Report: {datetime.datetime.now().strftime('%Y-%m-%d')}"
+
+        # Unique recipients, in order
+        results = {recipient: DeliveryStatus(recipient) for recipient in dict.fromkeys(recipients)}
+        queue: asyncio.Queue = asyncio.Queue()
+        for recipient in results:
+            queue.put_nowait(recipient)
+
+        workers = min(self.max_connections, len(results))
+        await asyncio.gather(*(self._worker(queue, html, subject, results) for _ in range(workers)))
+        return list(results.values())
+
+
+# Port 465 is implicit TLS, anything else upgrades with STARTTLS (as before)
+email_service = EmailService(
+    hostname=SMTP_SERVER,
+    port=SMTP_PORT,
+    sender=EMAIL_SENDER,
+    username=SMTP_USERNAME,
+    password=EMAIL_PASSWORD,
+    use_tls=SMTP_PORT == 465,
+    max_connections=CONFIG["email_max_connections"],
+    max_retries=CONFIG["email_max_retries"],
+    timeout=CONFIG["email_timeout"],
+)
+
+
+async def send_email(report_md: str, recipients: Optional[List[str]] = None) -> List[DeliveryStatus]:
+    """
+    Sends the Markdown report as an HTML email to `recipients` (default: EMAIL_RECIPIENT list).
+    """
+    recipients = recipients if recipients is not None else EMAIL_RECIPIENTS
+    if not SMTP_USERNAME or not EMAIL_PASSWORD or not recipients:
+        print("Email credentials missing. Skipping email send.")
+        return []
 
-        print("Email sent successfully!")
+    print(f"\n Sending email to {len(recipients)} recipient(s) via {SMTP_SERVER}...")
+    statuses = await email_service.send(report_md, recipients)
 
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+    delivered = sum(1 for status in statuses if status.ok)
+    for status in statuses:
+        if not status.ok:
+            print(f"   x {status.recipient}: {status.error} (after {status.attempts} attempts)")
+    print(f"Email delivered to {delivered}/{len(statuses)} recipients.")
+    return statuses
@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple, Union
+
+from app.config import CONFIG
+from app.services.rate_limit import LoopLocal
+
+
+def is_valid_content(text: str) -> bool:
+    """
+    Quality Gate: Checks if the scraped text is a real article.
+    """
+    if not text:
+        return False
+
+    # 1. Hard Length Limit
+    if len(text) < 600:
+        return False
+
+    # 2. Paywall Triggers
+    header_sample = text[:1000].lower()
+    block_triggers = [
+        "subscription required",
+        "subscribe to read",
+        "log in to continue",
+        "access this article",
+        "create an account",
+        "verify you are human",
+        "turn on javascript",
+    ]
+    if any(trigger in header_sample for trigger in block_triggers):
+        return False
+
+    # 3. The "Sidebar Trap" Detector (STRICT MODE)
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    # Headlines are usually < 100 chars. Real paragraphs are > 150.
+    # We set the bar at 120 to filter out long headlines while keeping short-ish paragraphs.
+    long_paragraphs = [line for line in lines if len(line) >= 150]
+
+    # We need at least 2 substantial paragraphs to call it an "Article"
+    if len(long_paragraphs) < 2:
+        return False
+
+    return True
+
+
+def extract_article(html: Union[str, bytes]) -> Tuple[Optional[str], bool]:
+    """
+    Worker task: HTML -> (markdown, passes is_valid_content).
+    Runs inside the process pool, so it must stay a picklable module-level function.
+    """
+    # Imported here (once per worker) so importing the scraper stays cheap
+    import trafilatura
+
+    content = trafilatura.extract(
+        html,
+        output_format="markdown",
+        include_links=True,
+        include_images=False,
+    )
+    return content, is_valid_content(content)
+
+
+class ExtractionExecutor:
+    """
+    Process pool for CPU-bound extraction (trafilatura/lxml hold the GIL).
+
+    - `workers` processes (0 falls back to a thread, e.g. for debugging).
+    - Each worker is replaced after `max_tasks_per_child` tasks to cap memory growth.
+    - A task exceeding `timeout` seconds is abandoned and the pool is recycled,
+      so one pathological page cannot pin a worker for the rest of the run.
+      Tasks are only submitted when a worker is free, so the timeout covers extraction alone,
+      and tasks that lose their worker to a recycle are resubmitted once to the new pool.
+    """
+
+    def __init__(self, workers: int, timeout: float = 20.0, max_tasks_per_child: int = 50):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool = None
+        # One slot per worker: nothing waits inside the pool, so `timeout` never counts queueing
+        self._slots = LoopLocal(lambda: asyncio.Semaphore(max(self.workers, 1)))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # 'spawn' is required for max_tasks_per_child and avoids forking a running event loop
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor):
+        # Several tasks may see the same broken pool; only the first one replaces it
+        if pool is None or pool is not self._pool:
+            return
+        self._pool = None
+        # Hung workers never return, so terminate them instead of waiting.
+        # Tasks still running on the other workers fail and are resubmitted by their callers.
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, html: Union[str, bytes]) -> Tuple[Optional[str], bool]:
+        """
+        Extracts markdown from HTML and runs the quality gate on it.
+        Returns (None, False) on timeout or worker failure.
+        """
+        if self.workers <= 0:
+            return await asyncio.to_thread(extract_article, html)
+
+        loop = asyncio.get_running_loop()
+        async with self._slots.get():
+            for _ in range(2):
+                pool = self._get_pool()
+                try:
+                    future = loop.run_in_executor(pool, extract_article, html)
+                    return await asyncio.wait_for(future, timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    print(f"      x Extraction timed out after {self.timeout}s. Recycling workers...")
+                    self._recycle(pool)
+                    return None, False
+                except (BrokenProcessPool, asyncio.CancelledError) as e:
+                    # Our own cancellation propagates; a cancelled/broken executor future does not
+                    if isinstance(e, asyncio.CancelledError) and asyncio.current_task().cancelling():
+                        raise
+                    if pool is self._pool:
+                        print("      x Extraction worker crashed. Recycling workers...")
+                    self._recycle(pool)
+        return None, False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+# Shared executor for the whole process (one run, or the daemon lifetime)
+extraction_executor = ExtractionExecutor(
+    workers=CONFIG["extract_workers"],
+    timeout=CONFIG["extract_timeout"],
+    max_tasks_per_child=CONFIG["extract_max_tasks_per_child"],
+)
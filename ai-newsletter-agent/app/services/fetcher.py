@@ -0,0 +1,122 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from app.config import CONFIG
+from app.services.browser import USER_AGENT
+from app.services.rate_limit import LoopLocal
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    status: int
+    body: Optional[bytes]
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class HTTPFetcher:
+    """
+    Native async HTTP layer for the static scrape path.
+
+    - One pooled httpx client per event loop (keep-alive, shared DNS/TLS, HTTP/2 if `h2` is installed).
+    - At most `per_host_limit` concurrent requests per publisher host.
+    - gzip/deflate (and br/zstd when available) are negotiated and decoded by httpx.
+    - Strict connect/read timeouts plus a total deadline, and a cap on the body size.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        per_host_limit: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        total_timeout: float = 30.0,
+        max_body_bytes: int = 5 * 1024 * 1024,
+    ):
+        self.per_host_limit = per_host_limit
+        self.total_timeout = total_timeout
+        self.max_body_bytes = max_body_bytes
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._client = LoopLocal(self._new_client)
+        self._host_slots = LoopLocal(dict)
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=self._limits,
+            timeout=self._timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+        )
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        slots = self._host_slots.get()
+        host = urlsplit(url).netloc.lower()
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slots[host]
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> FetchResult:
+        client = self._client.get()
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code != 200:
+                return FetchResult(response.status_code, None, dict(response.headers))
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > self.max_body_bytes:
+                raise BodyTooLarge(f"{url} declares {declared} bytes")
+
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_body_bytes:
+                    raise BodyTooLarge(f"{url} exceeds {self.max_body_bytes} bytes")
+                chunks.append(chunk)
+            return FetchResult(response.status_code, b"".join(chunks), dict(response.headers))
+
+    async def fetch(self, url: str, etag: str = None, last_modified: str = None) -> FetchResult:
+        """
+        GET with optional conditional headers. Status 304 means the cached copy is still valid.
+        Non-200 responses carry no body.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._host_slot(url):
+            return await asyncio.wait_for(self._get(url, headers), timeout=self.total_timeout)
+
+    async def close(self):
+        client = self._client.reset()
+        self._host_slots.reset()
+        if client is not None:
+            await client.aclose()
+
+
+# Shared fetcher for the whole process (one run, or the daemon lifetime)
+http_fetcher = HTTPFetcher(
+    max_connections=CONFIG["http_max_connections"],
+    per_host_limit=CONFIG["http_per_host_limit"],
+    connect_timeout=CONFIG["http_connect_timeout"],
+    read_timeout=CONFIG["http_read_timeout"],
+    total_timeout=CONFIG["http_total_timeout"],
+    max_body_bytes=CONFIG["http_max_body_mb"] * 1024 * 1024,
+)
@@ -0,0 +1,74 @@
+import os
+import time
+from typing import Iterable, Set
+
+from app.config import CONFIG
+from app.services.cache import SQLiteCache, canonicalize_url
+
+
+class SeenURLStore(SQLiteCache):
+    """
+    Persistent record of URLs that were already processed or published.
+    Lets deduplication span runs, so overlapping `days_back` windows don't re-select old stories.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS seen_urls (
+        url TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        first_seen REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_seen_urls_first_seen ON seen_urls(first_seen);
+    """
+
+    # Keep well below SQLite's host parameter limit
+    batch_size = 500
+
+    def __init__(self, path: str, ttl_seconds: float):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+
+    def filter_seen(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Bulk lookup. Returns the subset of `urls` (as given) that is already known.
+        """
+        by_key = {}
+        for url in urls:
+            by_key.setdefault(canonicalize_url(url), []).append(url)
+
+        keys = list(by_key)
+        seen = set()
+        for i in range(0, len(keys), self.batch_size):
+            chunk = keys[i : i + self.batch_size]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT url FROM seen_urls WHERE url IN ({placeholders})", chunk
+            ).fetchall()
+            for (key,) in rows:
+                seen.update(by_key[key])
+        return seen
+
+    def mark(self, urls: Iterable[str], status: str = "processed"):
+        """
+        Records URLs. The first-seen timestamp of known URLs is preserved.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO seen_urls (url, status, first_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = excluded.status",
+                [(canonicalize_url(url), status, now) for url in urls],
+            )
+
+    def prune(self) -> int:
+        """Drops entries older than the TTL. Returns the number of removed URLs."""
+        cutoff = time.time() - self.ttl_seconds
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM seen_urls WHERE first_seen < ?", (cutoff,))
+        return cursor.rowcount
+
+
+seen_store = SeenURLStore(
+    os.path.join(CONFIG["cache_dir"], "seen_urls.sqlite"),
+    ttl_seconds=CONFIG["seen_url_ttl_days"] * 86400,
+)
@@ -0,0 +1,21 @@
+class Lazy:
+    """
+    A value built on first `get()`. Heavy clients (and the libraries behind them) are only
+    constructed by the code paths that actually use them, which keeps CLI startup fast.
+    `set()` replaces the value, e.g. with a fake in benchmarks.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._built = False
+
+    def get(self):
+        if not self._built:
+            self._value = self.factory()
+            self._built = True
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        self._built = True
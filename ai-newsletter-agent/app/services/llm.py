@@ -1,19 +1,140 @@
+import asyncio
+import datetime
 import os
+import random
+import time
 
-from app.config import MODEL_FAST, MODEL_SMART
-from app.schemas import ArticleSummary, Newsletter
-from langchain_anthropic import ChatAnthropic
+from app.config import CONFIG, MODEL_FAST, MODEL_SMART
+from app.schemas import ArticleSummary, CompanySection, ExecutiveSummary, Newsletter
+from app.services.lazy import Lazy
+from app.services.rate_limit import AdaptiveLimiter, LoopLocal
+from app.telemetry import UsageCapture, telemetry
+from langchain_core.messages import SystemMessage
 
 # Check keys strictly before initializing
 if not os.environ.get("ANTHROPIC_API_KEY"):
     print("Warning: ANTHROPIC_API_KEY not found in environment.")
 
-# Initialize Models
-# max_retries=3 handles internal API errors (500s) automatically
-llm_fast = ChatAnthropic(model=MODEL_FAST, temperature=0, max_retries=3)
-llm_smart = ChatAnthropic(model=MODEL_SMART, temperature=0.3, max_retries=3)
+
+def chat_model(model: str, temperature: float):
+    # Imported on first use: langchain_anthropic + the anthropic SDK take seconds to import
+    from langchain_anthropic import ChatAnthropic
+
+    # Retries are handled by ainvoke_llm below so they can be counted and throttled
+    return ChatAnthropic(model=model, temperature=temperature, max_retries=0)
+
+
+# Initialize Models (lazily, on first use)
+llm_fast = Lazy(lambda: chat_model(MODEL_FAST, 0))
+llm_smart = Lazy(lambda: chat_model(MODEL_SMART, 0.3))
 
 # Bind Structured Outputs
 # This creates callable objects that return Pydantic models directly
-newsletter_generator = llm_smart.with_structured_output(Newsletter, strict=True)
-article_summarizer = llm_fast.with_structured_output(ArticleSummary, strict=True)
+newsletter_generator = Lazy(lambda: llm_smart.get().with_structured_output(Newsletter, strict=True))
+article_summarizer = Lazy(lambda: llm_fast.get().with_structured_output(ArticleSummary, strict=True))
+# Map-reduce editor: one section per company, then the executive summary
+section_writer = Lazy(lambda: llm_smart.get().with_structured_output(CompanySection, strict=True))
+summary_writer = Lazy(lambda: llm_smart.get().with_structured_output(ExecutiveSummary, strict=True))
+
+# Prompt-cache breakpoint: everything up to and including the marked block
+# (tool schema + system prompt) is cached by the provider for a few minutes
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def cached_system_message(text: str) -> SystemMessage:
+    """
+    System message marked as a prompt-cache breakpoint, so calls sharing the
+    same system prompt only pay for (and process) it once.
+    """
+    return SystemMessage(content=[{"type": "text", "text": text, "cache_control": CACHE_CONTROL}])
+
+
+# One adaptive concurrency limit for every LLM call of the process (summarizer and editor)
+llm_limiter = LoopLocal(
+    lambda: AdaptiveLimiter(
+        initial=CONFIG["max_concurrency"],
+        min_limit=CONFIG["llm_min_concurrency"],
+        max_limit=CONFIG["llm_max_concurrency"],
+    )
+)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient API failures worth retrying (429, 5xx/529 overloaded, network, timeouts)."""
+    import anthropic
+
+    if isinstance(error, (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def is_overload(error: Exception) -> bool:
+    """Rate limited (429) or overloaded (529): the signal to lower concurrency."""
+    return getattr(error, "status_code", None) in (429, 529)
+
+
+def retry_after_seconds(error: Exception) -> float:
+    """
+    How long the provider asks us to wait, from `retry-after` or, when a limit is
+    exhausted, the matching `anthropic-ratelimit-*-reset` timestamp. 0 if unknown.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return 0.0
+
+    wait = 0.0
+    try:
+        wait = float(headers.get("retry-after", 0))
+    except ValueError:
+        pass
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for kind in ("requests", "tokens", "input-tokens", "output-tokens"):
+        if headers.get(f"anthropic-ratelimit-{kind}-remaining") != "0":
+            continue
+        try:
+            reset = datetime.datetime.fromisoformat(headers[f"anthropic-ratelimit-{kind}-reset"].replace("Z", "+00:00"))
+            wait = max(wait, (reset - now).total_seconds())
+        except (KeyError, ValueError):
+            pass
+    return min(wait, 60.0)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: ~1s, 2s, 4s..."""
+    return min(30.0, 2**attempt) * random.uniform(0.5, 1.0)
+
+
+async def ainvoke_llm(runnable, messages, *, label: str):
+    """
+    Invokes an LLM runnable (or a Lazy one) under the shared adaptive limiter, with retries on transient errors.
+    Successes raise the concurrency limit, 429/529 lower it and pause for `retry-after`.
+    Records duration, token usage and retry count in the run telemetry.
+    """
+    if isinstance(runnable, Lazy):
+        runnable = runnable.get()
+    max_retries = CONFIG["llm_max_retries"]
+    limiter = llm_limiter.get()
+    start = time.perf_counter()
+    usage = UsageCapture()
+    for attempt in range(max_retries + 1):
+        try:
+            async with telemetry.queued(limiter, "llm"):
+                result = await runnable.ainvoke(messages, config={"callbacks": [usage]})
+            limiter.on_success()
+            telemetry.llm_call(label, time.perf_counter() - start, usage, attempt, ok=True)
+            return result
+        except Exception as e:
+            retry_after = 0.0
+            if is_overload(e):
+                retry_after = retry_after_seconds(e)
+                limiter.on_overload(retry_after)
+                telemetry.count("llm_overloaded")
+            if attempt >= max_retries or not is_retryable(e):
+                telemetry.llm_call(label, time.perf_counter() - start, usage, attempt, ok=False)
+                raise
+            telemetry.count("llm_retries")
+            # With a retry-after the limiter is paused already; otherwise back off
+            if not retry_after:
+                await asyncio.sleep(backoff_delay(attempt))
@@ -0,0 +1,99 @@
+"""
+Company matcher: one compiled regex over every name and keyword in TARGET_COMPANIES.
+
+A single pass over a text returns all matching companies with their match counts.
+Terms only match as whole words ("meta" does not match "metadata"), and longer terms
+win over their prefixes ("mistral large" over "mistral").
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from app.config import TARGET_COMPANIES, TargetCompany
+
+
+def _is_word_term(term: str) -> bool:
+    return bool(re.match(r"\w", term) and re.search(r"\w$", term))
+
+
+def _term_pattern(term: str) -> str:
+    # Word boundaries only where the term itself starts/ends with a word character ("gpt-" matches "gpt-5")
+    prefix = r"(?<!\w)" if re.match(r"\w", term) else ""
+    suffix = r"(?!\w)" if re.search(r"\w$", term) else ""
+    return prefix + re.escape(term) + suffix
+
+
+def build_pattern(terms: List[str]) -> Optional["re.Pattern"]:
+    """
+    One alternation, longest terms first. The boundaries of whole-word terms are factored out
+    of the alternation (per-alternative lookarounds stop sre from optimising it); the few terms
+    that start or end with punctuation keep their own and are tried after them.
+    """
+    terms = sorted(terms, key=len, reverse=True)
+    words = [re.escape(t) for t in terms if _is_word_term(t)]
+    others = [_term_pattern(t) for t in terms if not _is_word_term(t)]
+    parts = ([r"(?<!\w)(?:" + "|".join(words) + r")(?!\w)"] if words else []) + others
+    return re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+
+class CompanyMatcher:
+    def __init__(self, targets: List[TargetCompany]):
+        self.rebuild(targets)
+
+    def rebuild(self, targets: List[TargetCompany]):
+        """Recompiles the matcher for a new target list."""
+        # A term can belong to several companies (e.g. "nemo": NVIDIA and Mistral AI)
+        self.companies_by_term: Dict[str, List[str]] = {}
+        for target in targets:
+            for term in [target["name"], *target["keywords"]]:
+                term = term.lower().strip()
+                owners = self.companies_by_term.setdefault(term, [])
+                if term and target["name"] not in owners:
+                    owners.append(target["name"])
+        self.companies_by_term.pop("", None)
+        self.order = {target["name"]: i for i, target in enumerate(targets)}
+        # Matched text -> term, for case variants whose lower() is not a term ("OPENAİ", "ſora")
+        self._variants: Dict[str, str] = {}
+        self.pattern = build_pattern(list(self.companies_by_term))
+
+    def _term(self, matched: str) -> str:
+        """The term a match came from (IGNORECASE also matches Unicode case variants)."""
+        term = matched.lower()
+        if term in self.companies_by_term:
+            return term
+        if term not in self._variants:
+            self._variants[term] = next(
+                (t for t in self.companies_by_term if re.fullmatch(re.escape(t), matched, re.IGNORECASE)), ""
+            )
+        return self._variants[term]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """All companies mentioned in `text` -> number of keyword matches."""
+        counts: Dict[str, int] = {}
+        if not text or self.pattern is None:
+            return counts
+        for match in self.pattern.finditer(text):
+            for company in self.companies_by_term.get(self._term(match.group(0)), []):
+                counts[company] = counts.get(company, 0) + 1
+        return counts
+
+    def best(self, text: str) -> Optional[str]:
+        """
+        The company `text` is most about: most matches, then longest matched term
+        (so "Microsoft AI" beats a bare "AI"), then target order.
+        """
+        scores: Dict[str, tuple] = {}
+        if not text or self.pattern is None:
+            return None
+        for match in self.pattern.finditer(text):
+            term = self._term(match.group(0))
+            for company in self.companies_by_term.get(term, []):
+                count, longest = scores.get(company, (0, 0))
+                scores[company] = (count + 1, max(longest, len(term)))
+        if not scores:
+            return None
+        return max(scores, key=lambda c: (*scores[c], -self.order[c]))
+
+
+# Built once from the configured targets and shared by the monitor, editor and token budget
+company_matcher = CompanyMatcher(TARGET_COMPANIES)
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+    Allows `rate` requests per second (with bursts up to `burst`)
+    and at most `max_in_flight` requests running at the same time.
+
+    Usage:
+        async with bucket:
+            await do_request()
+    """
+
+    def __init__(self, rate: float, burst: int = 1, max_in_flight: int = 5):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Waits for a free slot, then for a token."""
+        await self._in_flight.acquire()
+        try:
+            # The lock keeps waiters in FIFO order, so tokens are handed out fairly
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        except BaseException:
+            self._in_flight.release()
+            raise
+
+    def release(self):
+        self._in_flight.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter (as in TCP congestion control).
+
+    - Additive increase: the limit grows by ~1 for every `limit` successful calls.
+    - Multiplicative decrease: an overload (429/529) multiplies it by `decrease`,
+      at most once per `cooldown` seconds so one burst of rejections counts once.
+    - `pause(seconds)` stops handing out slots until then (e.g. `retry-after`).
+
+    Usage:
+        async with limiter:
+            await call()
+        limiter.on_success()  /  limiter.on_overload(retry_after)
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease: float = 0.5,
+        cooldown: float = 2.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._changed = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._changed:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                try:
+                    # Re-check when a slot frees up, or when the pause ends
+                    await asyncio.wait_for(self._changed.wait(), timeout=pause if pause > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+    def on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self, retry_after: float = 0.0):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self._last_decrease = now
+        if retry_after > 0:
+            self.pause(retry_after)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class LoopLocal:
+    """
+    Holds one instance per running event loop.
+    asyncio primitives cannot be shared across loops, but we still want
+    process-wide limits (e.g. across fan-out branches of one run).
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._loop = None
+        self._value = None
+
+    def get(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._value = self.factory()
+        return self._value
+
+    def reset(self):
+        """Forgets the current instance and returns it (or None), e.g. to close it."""
+        value, self._loop, self._value = self._value, None, None
+        return value
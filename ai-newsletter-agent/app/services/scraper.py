@@ -1,83 +1,74 @@
-import asyncio
-import trafilatura
-from playwright.async_api import async_playwright
+import time
+from typing import Optional
 
+from app.services.browser import browser_pool
+from app.services.cache import scrape_cache
+from app.services.extraction import extraction_executor, is_valid_content  # noqa: F401
+from app.services.fetcher import http_fetcher
+from app.telemetry import telemetry
 
-def is_valid_content(text: str) -> bool:
-    """
-    Quality Gate: Checks if the scraped text is a real article.
-    """
-    if not text:
-        return False
-
-    # 1. Hard Length Limit
-    if len(text) < 600:
-        return False
-
-    # 2. Paywall Triggers
-    header_sample = text[:1000].lower()
-    block_triggers = [
-        "subscription required",
-        "subscribe to read",
-        "log in to continue",
-        "access this article",
-        "create an account",
-        "verify you are human",
-        "turn on javascript",
-    ]
-    if any(trigger in header_sample for trigger in block_triggers):
-        return False
-
-    # 3. The "Sidebar Trap" Detector (STRICT MODE)
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # Headlines are usually < 100 chars. Real paragraphs are > 150.
-    # We set the bar at 120 to filter out long headlines while keeping short-ish paragraphs.
-    long_paragraphs = [line for line in lines if len(line) >= 150]
-
-    # We need at least 2 substantial paragraphs to call it an "Article"
-    if len(long_paragraphs) < 2:
-        return False
-
-    return True
-
-
-async def apply_stealth_async(page):
+
+def cached_page(url: str):
+    try:
+        return scrape_cache.get(url)
+    except Exception as e:
+        print(f"      x Scrape cache error: {e}")
+        return None
+
+
+def store_page(url: str, content: Optional[str] = None, **validators):
     """
-    Async version of stealth injection.
+    Stores a scraped page (or, without `content`, refreshes a revalidated entry).
+    A cache error (e.g. a database locked by another process) never discards the article.
     """
-    await page.add_init_script(
-        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
-    )
-    await page.add_init_script("window.chrome = {runtime: {}};")
-    await page.add_init_script(
-        "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
-    )
-    await page.add_init_script(
-        "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});"
-    )
-
-
-async def scrape_url(url: str) -> str:
+    try:
+        if content is None:
+            store_page(url)
+        else:
+            scrape_cache.put(url, content, **validators)
+    except Exception as e:
+        print(f"      x Scrape cache error: {e}")
+
+
+async def scrape_url(url: str) -> Optional[str]:
     """
-    Async scraper.
+    Async scraper. Returns the full extracted article markdown, or None.
+    Trimming to the Summarizer's token budget happens later (see app/services/budget.py).
+    Serves fresh entries from the on-disk cache and revalidates stale ones with a conditional GET.
     """
+    start = time.perf_counter()
+
+    # --- ATTEMPT 0: On-disk cache ---
+    cached = cached_page(url)
+    if cached and cached.is_fresh(scrape_cache.ttl_seconds):
+        print(f"   -> Cache hit: {url}")
+        telemetry.item("scrape", url, time.perf_counter() - start, outcome="cache")
+        return cached.content
+
     print(f"   -> Scraping: {url}")
     content = None
     is_blocked = False
+    source = "static"
+    etag = last_modified = None
 
-    # --- ATTEMPT 1: Fast Static Scrape (Trafilatura) ---
-    # Trafilatura is blocking, so we offload just this part to a thread
+    # --- ATTEMPT 1: Fast Static Scrape (pooled async HTTP + Trafilatura) ---
     try:
-        downloaded = await asyncio.to_thread(trafilatura.fetch_url, url)
-        if downloaded:
-            content = await asyncio.to_thread(
-                trafilatura.extract,
-                downloaded,
-                output_format="markdown",
-                include_links=True,
-                include_images=False,
-            )
+        response = await http_fetcher.fetch(
+            url,
+            etag=cached.etag if cached else None,
+            last_modified=cached.last_modified if cached else None,
+        )
+        if response.status == 304 and cached:
+            print(f"      > Not modified, reusing cached copy.")
+            store_page(url)
+            telemetry.item("scrape", url, time.perf_counter() - start, outcome="not_modified")
+            return cached.content
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if response.body:
+            # Extraction is CPU bound, so it runs in the process pool
+            content, _ = await extraction_executor.extract(response.body)
     except Exception:
         pass
 
@@ -89,24 +80,12 @@ async def scrape_url(url: str) -> str:
     # --- ATTEMPT 2: Stealth Browser (Async Playwright) ---
     if not content or len(content) < 600 or is_blocked:
         print("      x Static scrape failed/blocked. Launching Stealth Browser...")
+        # Validators of the static response do not describe the rendered page
+        etag = last_modified = None
 
-        async with async_playwright() as p:
-            try:
-                # Launch browser
-                browser = await p.chromium.launch(
-                    headless=True, args=["--disable-blink-features=AutomationControlled"]
-                )
-
-                # Context configuration
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    locale="en-US",
-                    timezone_id="America/New_York",
-                )
-
-                page = await context.new_page()
-                await apply_stealth_async(page)
-
+        try:
+            # Pages come from the shared pool (no per-URL browser launch)
+            async with browser_pool.page() as page:
                 # Navigation
                 try:
                     await page.goto(url, wait_until="domcontentloaded", timeout=25000)
@@ -119,30 +98,25 @@ async def scrape_url(url: str) -> str:
 
                     html = await page.content()
 
-                    # Extract content (Trafilatura is CPU bound, run in thread)
-                    content = await asyncio.to_thread(
-                        trafilatura.extract,
-                        html,
-                        output_format="markdown",
-                        include_links=True,
-                        include_images=False,
-                    )
-                    if not is_valid_content(content):
+                    # Extract + quality gate in the process pool (CPU bound)
+                    content, valid = await extraction_executor.extract(html)
+                    if not valid:
                         print(f"      x Browser scrape rejected (Still Paywalled/Junk).")
                         content = None
+                    else:
+                        source = "browser"
 
                 except Exception as e:
                     print(f"      x Browser timeout/error: {e}")
-                finally:
-                    await browser.close()
 
-            except Exception as e:
-                print(f"      x Browser failed to launch: {e}")
+        except Exception as e:
+            print(f"      x Browser failed to launch: {e}")
 
     # --- FINAL FORMATTING ---
     if content and "Cloudflare Ray ID" not in content:
-        if len(content) > 20000:
-            content = content[:20000] + "... [TRUNCATED]"
-        return f"FULL ARTICLE CONTENT:\n{content}\n---\n"
+        store_page(url, content, etag=etag, last_modified=last_modified)
+        telemetry.item("scrape", url, time.perf_counter() - start, outcome=source)
+        return content
 
+    telemetry.item("scrape", url, time.perf_counter() - start, outcome="failed")
     return None
@@ -1,10 +1,114 @@
+import asyncio
+import time
+from typing import Dict
+
 from app.config import BLACKLIST_DOMAINS, CONFIG
-from langchain_tavily import TavilySearch
+from app.services.cache import search_cache
+from app.services.lazy import Lazy
+from app.services.rate_limit import LoopLocal, TokenBucket
+from app.telemetry import telemetry
+
+
+def news_search_tool(max_results: int = None):
+    # Imported on first use, like the LLM clients
+    from langchain_tavily import TavilySearch
+
+    return TavilySearch(
+        max_results=max_results or CONFIG["max_search_results"],
+        search_depth=CONFIG["search_depth"],
+        topic="news",
+        exclude_domains=BLACKLIST_DOMAINS,
+    )
+
 
 # Tool for finding specific company news
-tavily_news = TavilySearch(
-    max_results=CONFIG["max_search_results"],
-    search_depth=CONFIG["search_depth"],
-    topic="news",
-    exclude_domains=BLACKLIST_DOMAINS,
+tavily_news = Lazy(news_search_tool)
+# Consolidated discovery: one query covers several companies, so it returns more results
+tavily_news_broad = Lazy(lambda: news_search_tool(CONFIG["consolidated_max_results"]))
+
+# Shared by every search call in the process (one bucket per event loop)
+search_limiter = LoopLocal(
+    lambda: TokenBucket(
+        rate=CONFIG["search_requests_per_second"],
+        burst=CONFIG["search_burst"],
+        max_in_flight=CONFIG["search_max_in_flight"],
+    )
 )
+
+
+# Background refreshes of stale cache entries, one per cache key
+_revalidations: Dict[str, asyncio.Task] = {}
+
+
+async def fetch_news(query: str, start_date: str, key: str, broad: bool = False):
+    """
+    Live Tavily search, throttled by the shared token bucket. Successful responses are cached raw.
+    """
+    tool = tavily_news_broad if broad else tavily_news
+    async with telemetry.queued(search_limiter.get(), "search"):
+        start = time.perf_counter()
+        response = await tool.get().ainvoke({"query": query, "start_date": start_date})
+        telemetry.item("search", query, time.perf_counter() - start, cache="miss")
+    if isinstance(response, dict) and "error" not in response:
+        try:
+            search_cache.put(key, query, start_date, response)
+        except Exception as e:
+            # The paid response is still used, only the cache entry is lost
+            print(f"      x Search cache error: {e}")
+    return response
+
+
+def _revalidate(query: str, start_date: str, key: str, broad: bool):
+    if key in _revalidations:
+        return
+
+    async def refresh():
+        try:
+            await fetch_news(query, start_date, key, broad)
+        except Exception as e:
+            print(f"      x Background search refresh failed: {e}")
+        finally:
+            _revalidations.pop(key, None)
+
+    _revalidations[key] = asyncio.create_task(refresh())
+
+
+async def wait_for_revalidations():
+    """Lets pending background refreshes finish (call before the event loop ends)."""
+    if _revalidations:
+        await asyncio.gather(*list(_revalidations.values()), return_exceptions=True)
+
+
+async def search_news(query: str, start_date: str, broad: bool = False):
+    """
+    Async Tavily search through the search cache:
+    fresh entries are returned without a call, stale ones are returned and refreshed
+    in the background, misses are fetched live.
+    `broad` uses the consolidated-discovery client (`consolidated_max_results` results).
+    """
+    max_results = CONFIG["consolidated_max_results"] if broad else CONFIG["max_search_results"]
+    key = search_cache.make_key(query, start_date, CONFIG["search_depth"], max_results, BLACKLIST_DOMAINS)
+    try:
+        # Replay runs may be on a later day, so their start date (part of the key) no longer matches
+        entry = search_cache.latest(query) if search_cache.replay else search_cache.get(key)
+    except Exception as e:
+        print(f"      x Search cache error: {e}")
+        entry = None
+    if entry is not None:
+        if search_cache.replay or entry.age < search_cache.ttl_seconds:
+            telemetry.count("search_cache_hits")
+            telemetry.item("search", query, 0.0, cache="fresh")
+            return entry.response
+        if entry.age < search_cache.ttl_seconds + search_cache.stale_seconds:
+            telemetry.count("search_cache_stale")
+            telemetry.item("search", query, 0.0, cache="stale")
+            _revalidate(query, start_date, key, broad)
+            return entry.response
+
+    if search_cache.replay:
+        # Replay never calls the API; a query without a recorded response finds nothing
+        print(f"      x No recorded response for: {query[:60]}...")
+        return {"results": []}
+
+    telemetry.count("search_cache_misses")
+    return await fetch_news(query, start_date, key, broad)
@@ -1,11 +1,28 @@
 import operator
-from typing import Annotated, List, TypedDict
+from typing import Annotated, Dict, List, Optional, TypedDict
+
+from app.config import TargetCompany
+from app.schemas import Article, SearchHit, SummaryRecord
 
 
 class AgentState(TypedDict):
-    search_results: Annotated[List[str], operator.add]
-    scraped_articles: Annotated[List[str], operator.add]
-    summaries: Annotated[List[str], operator.add]
+    search_results: Annotated[List[SearchHit], operator.add]
+    scraped_articles: Annotated[List[Article], operator.add]
+    # One representative per near-duplicate cluster (linear mode)
+    unique_articles: Annotated[List[Article], operator.add]
+    summaries: Annotated[List[SummaryRecord], operator.add]
     seen_urls: Annotated[List[str], operator.add]
     final_report: str
+    # Profile name -> report, when NEWSLETTER_PROFILES is set (instead of final_report)
+    profile_reports: Dict[str, str]
     steps: Annotated[int, operator.add]
+    # ISO timestamp: only search news since then (daemon polls); None = the last `days_back` days
+    search_since: Optional[str]
+
+
+class CompanyTask(TypedDict):
+    """Input of one fan-out branch (see `company_pipeline`)."""
+
+    target: TargetCompany
+    seen_urls: List[str]
+    search_since: Optional[str]
@@ -0,0 +1,225 @@
+"""
+Per-run instrumentation.
+
+Collects stage and item timings, scrape outcomes, LLM token usage, retries and
+semaphore queue waits, and writes them as a machine-readable JSON run report.
+If `opentelemetry` is installed and OTEL_EXPORT=1, every record is also emitted as a span
+(exporters are configured through the standard OTEL_* environment variables).
+"""
+
+import asyncio
+import datetime
+import functools
+import json
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+class UsageCapture(BaseCallbackHandler):
+    """
+    LangChain callback that captures token usage of the chat model call(s) it is attached to.
+    One instance per LLM call.
+    """
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.output_tokens += usage.get("output_tokens", 0)
+                # input_tokens is the total, including cache reads and writes
+                details = usage.get("input_token_details") or {}
+                self.cache_read_tokens += details.get("cache_read", 0) or 0
+                # Zeroed when the per-TTL breakdown (ephemeral_5m/1h) is reported instead
+                self.cache_creation_tokens += (details.get("cache_creation", 0) or 0) + sum(
+                    details.get(key, 0) or 0 for key in ("ephemeral_5m_input_tokens", "ephemeral_1h_input_tokens")
+                )
+
+
+class RunTelemetry:
+    def __init__(self, run_id: Optional[str] = None):
+        self.reset(run_id)
+        self._tracer = None
+        if otel_trace is not None and os.environ.get("OTEL_EXPORT", "0") == "1":
+            self._tracer = otel_trace.get_tracer("ai-newsletter-agent")
+
+    def reset(self, run_id: Optional[str] = None):
+        """Starts a fresh report (called once per run)."""
+        self.run_id = run_id or datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        self._t0 = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.items: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.queue_waits: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+
+    # --- Recording ---
+
+    def _span(self, name: str, start: float, end: float, attributes: Dict[str, Any]):
+        if self._tracer is None:
+            return
+        # Convert perf_counter offsets to wall-clock epoch nanoseconds
+        offset = time.time() - time.perf_counter()
+        span = self._tracer.start_span(name, start_time=int((start + offset) * 1e9))
+        for key, value in attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                span.set_attribute(key, value)
+        span.end(end_time=int((end + offset) * 1e9))
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a whole pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stages[name] = {
+                "start_s": round(start - self._t0, 4),
+                "duration_s": round(end - start, 4),
+            }
+            self._span(f"stage.{name}", start, end, {"run_id": self.run_id})
+
+    def item(self, stage: str, key: str, duration_s: float, **fields):
+        """Records one unit of work inside a stage (a URL, an article, a company...)."""
+        end = time.perf_counter()
+        record = {"stage": stage, "key": key, "duration_s": round(duration_s, 4), **fields}
+        self.items.append(record)
+        self._span(f"item.{stage}", end - duration_s, end, {"key": key, **fields})
+
+    def llm_call(self, label: str, duration_s: float, usage: Optional[UsageCapture], retries: int, ok: bool):
+        record = {"label": label, "duration_s": round(duration_s, 4), "retries": retries, "ok": ok}
+        if usage is not None:
+            record.update(
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_read_tokens=usage.cache_read_tokens,
+                cache_creation_tokens=usage.cache_creation_tokens,
+            )
+        self.llm_calls.append(record)
+        end = time.perf_counter()
+        self._span(f"llm.{label}", end - duration_s, end, record)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @asynccontextmanager
+    async def queued(self, limiter, name: str):
+        """`async with` a semaphore/limiter while recording how long we waited for it."""
+        start = time.perf_counter()
+        async with limiter:
+            self.queue_waits.setdefault(name, []).append(time.perf_counter() - start)
+            yield
+
+    # --- Reporting ---
+
+    @staticmethod
+    def _cache_stats(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Prompt-cache usage over a set of LLM calls (hit rate = share of input tokens read from cache)."""
+        input_tokens = sum(call.get("input_tokens", 0) for call in calls)
+        cache_read = sum(call.get("cache_read_tokens", 0) for call in calls)
+        return {
+            "calls": len(calls),
+            "input_tokens": input_tokens,
+            "cache_read_tokens": cache_read,
+            "cache_creation_tokens": sum(call.get("cache_creation_tokens", 0) for call in calls),
+            "cache_hit_rate": round(cache_read / input_tokens, 4) if input_tokens else None,
+            "calls_with_cache_hit": sum(1 for call in calls if call.get("cache_read_tokens", 0) > 0),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        def total(key):
+            return sum(call.get(key, 0) for call in self.llm_calls)
+
+        waits = {
+            name: {
+                "count": len(values),
+                "mean_s": round(sum(values) / len(values), 4),
+                "max_s": round(max(values), 4),
+            }
+            for name, values in self.queue_waits.items()
+            if values
+        }
+        scrape_outcomes = {}
+        for item in self.items:
+            if item["stage"] == "scrape":
+                outcome = item.get("outcome", "unknown")
+                scrape_outcomes[outcome] = scrape_outcomes.get(outcome, 0) + 1
+
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "duration_s": round(time.perf_counter() - self._t0, 4),
+            "stages": self.stages,
+            "scrape_outcomes": scrape_outcomes,
+            "llm": {
+                "calls": len(self.llm_calls),
+                "failed": sum(1 for call in self.llm_calls if not call["ok"]),
+                "retries": sum(call["retries"] for call in self.llm_calls),
+                "input_tokens": total("input_tokens"),
+                "output_tokens": total("output_tokens"),
+                "cache_read_tokens": total("cache_read_tokens"),
+                "cache_creation_tokens": total("cache_creation_tokens"),
+                "cache_hit_rate": self._cache_stats(self.llm_calls)["cache_hit_rate"],
+            },
+            "prompt_cache": {
+                label: self._cache_stats([call for call in self.llm_calls if call["label"] == label])
+                for label in sorted({call["label"] for call in self.llm_calls})
+            },
+            "queue_waits": waits,
+            "counters": self.counters,
+            "items": self.items,
+            "llm_calls": self.llm_calls,
+        }
+
+    def write(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+# Process-wide report for the current run
+telemetry = RunTelemetry()
+
+
+def timed_stage(name: str):
+    """
+    Decorator for graph nodes (sync or async): records the node as a stage.
+    """
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with telemetry.stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with telemetry.stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,124 @@
+"""
+Startup benchmark for the CLI.
+
+Runs each case in a fresh interpreter (so nothing is cached in `sys.modules`) and reports
+the median wall time. Lightweight commands must stay under `--max-light-seconds`; the
+process exits with status 1 otherwise.
+
+Usage (from the ai-newsletter-agent directory):
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --repeat 5 --json startup.json
+    python -m benchmarks.bench_import --importtime "import app.agent.nodes"
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+# (name, argv after the interpreter, lightweight?)
+CASES = [
+    ("python (baseline)", ["-c", "pass"], True),
+    ("import app.config", ["-c", "import app.config"], True),
+    ("main.py --help", [MAIN, "--help"], True),
+    ("main.py render-only", [MAIN, "render-only"], True),
+    ("main.py resend-email", [MAIN, "resend-email"], True),
+    ("import app.agent.nodes (search)", ["-c", "import app.agent.nodes"], False),
+    ("import app.agent.graph (run)", ["-c", "import app.agent.graph"], False),
+    (
+        "build LLM + search clients",
+        ["-c", "from app.services import llm, search; llm.article_summarizer.get(); search.tavily_news.get()"],
+        False,
+    ),
+]
+
+
+def offline_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # Clients only need *some* key to be constructed; empty SMTP password = resend skips sending
+    env.setdefault("ANTHROPIC_API_KEY", "offline-benchmark")
+    env.setdefault("TAVILY_API_KEY", "offline-benchmark")
+    env["EMAIL_PASSWORD"] = ""
+    env.pop("NEWSLETTER_PROFILES", None)
+    return env
+
+
+def time_case(argv, cwd: str, env: dict) -> float:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *argv], cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed:\n{result.stderr[-2000:]}")
+    return elapsed
+
+
+def print_importtime(code: str, env: dict, top: int = 20):
+    """Top modules by cumulative import time (python -X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), module.rstrip()))
+    print(f"Top {top} cumulative imports for: {code}")
+    for cumulative, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1e6:>8.3f}s {module}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI startup / import-time benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (median is reported)")
+    parser.add_argument("--max-light-seconds", type=float, default=1.0, help="Budget for lightweight commands")
+    parser.add_argument("--importtime", metavar="CODE", help="Only print the import-time breakdown of CODE")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    env = offline_env()
+    if args.importtime:
+        print_importtime(args.importtime, env)
+        return None
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # A saved report for today, so render-only / resend-email have something to work on
+        os.makedirs(os.path.join(tmp_dir, "output"))
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        with open(os.path.join(tmp_dir, "output", f"AI_Newsletter_{today}.md"), "w", encoding="utf-8") as f:
+            f.write("# THE DAILY AI | Market Report\n\n- Benchmark report\n")
+
+        for name, case_argv, light in CASES:
+            times = [time_case(case_argv, tmp_dir, env) for _ in range(args.repeat)]
+            rows.append({"case": name, "median_s": round(statistics.median(times), 3), "lightweight": light})
+
+    over_budget = [r for r in rows if r["lightweight"] and r["median_s"] > args.max_light_seconds]
+    print(f"\n=== CLI startup ({args.repeat} runs per case, median) ===")
+    for row in rows:
+        flag = " (light)" if row["lightweight"] else ""
+        print(f"{row['case'] + flag:<42}{row['median_s']:>8.3f}s")
+    if over_budget:
+        print(f"Over the {args.max_light_seconds}s budget: {', '.join(r['case'] for r in over_budget)}")
+
+    report = {"repeat": args.repeat, "max_light_seconds": args.max_light_seconds, "cases": rows}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if over_budget:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
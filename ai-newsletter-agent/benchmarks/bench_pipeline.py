@@ -0,0 +1,291 @@
+"""
+Offline end-to-end benchmark of `workflow_app`.
+
+Runs the real graph against local stand-ins (fake Tavily, a local HTML corpus server,
+fake chat models with configurable latency) and reports per-stage wall time, throughput,
+peak RSS and the number of LLM calls.
+
+Usage (from the ai-newsletter-agent directory):
+    python -m benchmarks.bench_pipeline --companies 23
+    python -m benchmarks.bench_pipeline --companies 500 --mode fanout --llm-latency 0.5 --json out.json
+    python -m benchmarks.bench_pipeline --companies 100 --summarize-mode batch
+    python -m benchmarks.bench_pipeline --companies 150 --editor-mode mapreduce
+    python -m benchmarks.bench_pipeline --companies 40 --profiles 8
+    python -m benchmarks.bench_pipeline --companies 200 --search-mode consolidated
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Offline run: the real clients only need *some* key to be constructed
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+
+from app.config import CONFIG, NEWSLETTER_PROFILES, TARGET_COMPANIES  # noqa: E402
+from app.schemas import ArticleSummary, CompanySection, ExecutiveSummary, Newsletter  # noqa: E402
+
+from benchmarks.fakes import (  # noqa: E402
+    CorpusServer,
+    FakeBatchServer,
+    FakeSearchTool,
+    FakeStructuredLLM,
+    make_targets,
+)
+
+# Items each node produces, used for throughput
+STAGE_ITEMS = {
+    "monitor": "search_results",
+    "scraper": "scraped_articles",
+    "dedup": "unique_articles",
+    "summarizer": "summaries",
+    "company": "summaries",
+    "editor": None,
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return max(own, children)
+
+
+def make_profiles(count: int, targets) -> list:
+    """`count` overlapping segments, each covering half of the targets (wrapping around)."""
+    names = [t["name"] for t in targets]
+    size, step = max(1, len(names) // 2), max(1, len(names) // max(count, 1))
+    return [
+        {"name": f"Segment {i + 1}", "companies": [names[(i * step + k) % len(names)] for k in range(size)]}
+        for i in range(count)
+    ]
+
+
+def configure(args, tmp_dir: str):
+    """
+    Applies benchmark settings and swaps every external backend for a local fake.
+    Must run before the first event loop touches the shared limiters.
+    """
+    from app.agent import nodes
+    from app.services import llm, search
+    from app.services.cache import scrape_cache, search_cache, summary_cache
+    from app.services.history import seen_store
+    from app.services.matcher import company_matcher
+
+    CONFIG["graph_mode"] = args.mode
+    CONFIG["summarize_mode"] = args.summarize_mode
+    CONFIG["editor_mode"] = args.editor_mode
+    CONFIG["search_mode"] = args.search_mode
+    CONFIG["batch_min_articles"] = 1
+    CONFIG["search_requests_per_second"] = args.search_rps
+    CONFIG["search_max_in_flight"] = args.search_in_flight
+    CONFIG["max_concurrency"] = args.concurrency
+    CONFIG["max_articles"] = max(CONFIG["max_articles"], 2 * args.companies)
+
+    # Fresh on-disk stores so every run starts cold
+    for store in (scrape_cache, search_cache, summary_cache, seen_store):
+        store.close()
+        store.path = os.path.join(tmp_dir, os.path.basename(store.path))
+
+    targets = make_targets(args.companies, TARGET_COMPANIES)
+    # Mutate in place: every module holds a reference to the same list
+    TARGET_COMPANIES[:] = targets
+    company_matcher.rebuild(targets)
+    NEWSLETTER_PROFILES[:] = make_profiles(args.profiles, targets)
+
+    corpus = CorpusServer(corpus_size=args.corpus_size or args.companies * 5, page_kb=args.page_kb)
+    base_url = corpus.start()
+
+    fake_searches = [
+        FakeSearchTool(base_url, targets, latency=args.search_latency, max_results=CONFIG["max_search_results"]),
+        FakeSearchTool(base_url, targets, latency=args.search_latency, max_results=CONFIG["consolidated_max_results"]),
+    ]
+    fake_summarizer = FakeStructuredLLM(
+        ArticleSummary, targets, latency=args.llm_latency, capacity=args.llm_capacity
+    )
+    if args.editor_mode == "mapreduce":
+        fake_editor = FakeStructuredLLM(CompanySection, targets, latency=args.editor_latency)
+        llm.section_writer.set(fake_editor)
+        llm.summary_writer.set(FakeStructuredLLM(ExecutiveSummary, targets, latency=args.editor_latency))
+    else:
+        fake_editor = FakeStructuredLLM(Newsletter, targets, latency=args.editor_latency)
+
+    # The clients are Lazy: swap in the fakes before anything builds the real ones
+    search.tavily_news.set(fake_searches[0])
+    search.tavily_news_broad.set(fake_searches[1])
+    llm.article_summarizer.set(fake_summarizer)
+    if args.editor_mode != "mapreduce":
+        llm.newsletter_generator.set(fake_editor)
+
+    # Batch mode talks to a local Message Batches endpoint through the real SDK client
+    batch_server = None
+    if args.summarize_mode == "batch":
+        import anthropic
+        from app.services.batch import BatchSummarizer
+
+        batch_server = FakeBatchServer(fake_summarizer, latency=args.batch_latency)
+        client = anthropic.AsyncAnthropic(base_url=batch_server.start(), api_key="offline-benchmark")
+        nodes.batch_summarizer = BatchSummarizer(client=client, poll_interval=0.1)
+
+    return corpus, fake_searches, fake_summarizer, fake_editor, batch_server
+
+
+async def run_graph(mode: str):
+    from app.agent.graph import build_workflow
+    from app.services.browser import browser_pool
+    from app.services.fetcher import http_fetcher
+
+    app = build_workflow(mode).compile()
+    initial_state = {
+        "search_results": [],
+        "scraped_articles": [],
+        "unique_articles": [],
+        "summaries": [],
+        "seen_urls": [],
+        "final_report": "",
+        "profile_reports": {},
+        "steps": 0,
+        "search_since": None,
+    }
+
+    # Per-node: first/last completion time and number of produced items
+    stages = {}
+    started = time.perf_counter()
+    try:
+        async for update in app.astream(initial_state, stream_mode="updates"):
+            now = time.perf_counter() - started
+            for node, payload in update.items():
+                stage = stages.setdefault(node, {"first": now, "last": now, "items": 0, "updates": 0})
+                stage["last"] = now
+                stage["updates"] += 1
+                key = STAGE_ITEMS.get(node)
+                if key and isinstance(payload, dict):
+                    stage["items"] += len(payload.get(key, []))
+    finally:
+        await browser_pool.close()
+        await http_fetcher.close()
+
+    return time.perf_counter() - started, stages
+
+
+def build_report(args, total, stages, corpus, fake_searches, fake_summarizer, fake_editor) -> dict:
+    from app.telemetry import telemetry
+
+    run_report = telemetry.to_dict()
+    rows = []
+    previous_end = 0.0
+    for node, stage in sorted(stages.items(), key=lambda kv: kv[1]["last"]):
+        wall = stage["last"] - previous_end
+        previous_end = stage["last"]
+        rows.append(
+            {
+                "stage": node,
+                "wall_s": round(wall, 3),
+                "items": stage["items"],
+                "items_per_s": round(stage["items"] / wall, 2) if wall > 0 and stage["items"] else None,
+                "branches": stage["updates"],
+            }
+        )
+
+    return {
+        "mode": args.mode,
+        "summarize_mode": args.summarize_mode,
+        "editor_mode": args.editor_mode,
+        "search_mode": args.search_mode,
+        "profiles": args.profiles,
+        "companies": args.companies,
+        "total_s": round(total, 3),
+        "stages": rows,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "search_calls": sum(fake.calls for fake in fake_searches),
+        "http_requests": corpus.requests,
+        "llm_calls": {"summarizer": fake_summarizer.calls, "editor": fake_editor.calls},
+        "llm_rejected": fake_summarizer.rejected,
+        "llm_peak_concurrency": fake_summarizer.peak_active,
+        "counters": run_report["counters"],
+        "scrape_outcomes": run_report["scrape_outcomes"],
+        "queue_waits": run_report["queue_waits"],
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"\n=== Benchmark: {report['companies']} companies, mode={report['mode']}, "
+        f"summarize={report['summarize_mode']}, editor={report['editor_mode']}, "
+        f"search={report['search_mode']}, profiles={report['profiles']} ==="
+    )
+    print(f"{'stage':<12}{'wall (s)':>10}{'items':>8}{'items/s':>10}{'branches':>10}")
+    for row in report["stages"]:
+        rate = row["items_per_s"] if row["items_per_s"] is not None else "-"
+        print(f"{row['stage']:<12}{row['wall_s']:>10}{row['items']:>8}{rate:>10}{row['branches']:>10}")
+    print(f"total: {report['total_s']}s | peak RSS: {report['peak_rss_mb']} MB")
+    print(
+        f"search calls: {report['search_calls']} | HTTP requests: {report['http_requests']} | "
+        f"LLM calls: {report['llm_calls']}"
+    )
+    print(f"LLM peak concurrency: {report['llm_peak_concurrency']} | rejected (429): {report['llm_rejected']}")
+    print(f"scrape outcomes: {report['scrape_outcomes']} | counters: {report['counters']}")
+    for name, wait in report["queue_waits"].items():
+        print(f"queue wait [{name}]: mean {wait['mean_s']}s, max {wait['max_s']}s over {wait['count']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline per-stage benchmark of the newsletter pipeline.")
+    parser.add_argument("--companies", type=int, default=23, help="Number of target companies (23 to 500+)")
+    parser.add_argument("--mode", choices=["linear", "fanout"], default=CONFIG["graph_mode"])
+    parser.add_argument("--summarize-mode", choices=["interactive", "batch"], default=CONFIG["summarize_mode"])
+    parser.add_argument("--batch-latency", type=float, default=1.0, help="Seconds until a fake batch ends")
+    parser.add_argument("--editor-mode", choices=["single", "mapreduce"], default=CONFIG["editor_mode"])
+    parser.add_argument(
+        "--search-mode", choices=["per_company", "consolidated"], default=CONFIG["search_mode"]
+    )
+    parser.add_argument("--profiles", type=int, default=0, help="Newsletter profiles rendered from one run")
+    parser.add_argument("--corpus-size", type=int, default=0, help="Distinct HTML pages (default: 5 per company)")
+    parser.add_argument("--page-kb", type=int, default=20, help="Approximate article size in KB")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per summarizer call")
+    parser.add_argument("--llm-capacity", type=int, default=0, help="Fake 429s above this many calls in flight")
+    parser.add_argument("--editor-latency", type=float, default=1.0, help="Seconds per editor call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Seconds per search call")
+    parser.add_argument("--search-rps", type=float, default=CONFIG["search_requests_per_second"])
+    parser.add_argument("--search-in-flight", type=int, default=CONFIG["search_max_in_flight"])
+    parser.add_argument("--concurrency", type=int, default=CONFIG["max_concurrency"])
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own progress output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus, fake_searches, fake_summarizer, fake_editor, batch_server = configure(args, tmp_dir)
+        # The nodes log every item; keep the report readable unless asked otherwise
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        try:
+            with output:
+                total, stages = asyncio.run(run_graph(args.mode))
+        finally:
+            corpus.stop()
+            if batch_server is not None:
+                batch_server.stop()
+            from app.services.extraction import extraction_executor
+
+            extraction_executor.close()
+
+    report = build_report(args, total, stages, corpus, fake_searches, fake_summarizer, fake_editor)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Local stand-ins for Tavily, publisher sites and the Anthropic models.
+Used by the offline benchmarks; nothing here talks to the network.
+"""
+
+import asyncio
+import datetime
+import http.server
+import json
+import random
+import re
+import threading
+import time
+
+import anthropic
+import httpx
+from app.schemas import ArticleSummary, CompanySection, ExecutiveSummary, Newsletter
+
+
+def make_targets(count: int, base: list) -> list:
+    """
+    First `count` real targets, padded with synthetic companies when count > len(base).
+    """
+    targets = [dict(t) for t in base[:count]]
+    for i in range(len(targets), count):
+        name = f"Synthetic Co {i:04d}"
+        targets.append({"name": name, "keywords": [name.lower(), f"synco{i:04d}"]})
+    return targets
+
+
+class CorpusServer:
+    """
+    Threaded local HTTP server serving a deterministic HTML corpus.
+    `/article/<n>` returns page n % corpus_size, roughly `page_kb` KB of article text.
+    """
+
+    def __init__(self, corpus_size: int = 200, page_kb: int = 20):
+        self.corpus_size = corpus_size
+        self.page_kb = page_kb
+        self.requests = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _page(self, n: int) -> bytes:
+        n %= self.corpus_size
+        if n not in self._pages:
+            rng = random.Random(n)
+            words = ["model", "launch", "funding", "benchmark", "context", "agents", "gpu", "release"]
+            paragraphs = []
+            while sum(len(p) for p in paragraphs) < self.page_kb * 1024:
+                sentence = " ".join(rng.choice(words) for _ in range(40))
+                paragraphs.append(f"<p>Article {n} paragraph {len(paragraphs)}: {sentence}.</p>")
+            html = (
+                f"<html><head><title>Article {n}</title></head><body>"
+                f"<article><h1>Headline {n}</h1>{''.join(paragraphs)}</article></body></html>"
+            )
+            self._pages[n] = html.encode("utf-8")
+        return self._pages[n]
+
+    def start(self) -> str:
+        corpus = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                match = re.search(r"/article/(\d+)", self.path)
+                with corpus._lock:
+                    corpus.requests += 1
+                    body = corpus._page(int(match.group(1))) if match else b""
+                self.send_response(200 if match else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeSearchTool:
+    """
+    Stands in for `TavilySearch`: returns `hits_per_query` synthetic hits per company named in the
+    query, pointing at the local corpus server. A query naming several companies returns their hits
+    interleaved by rank, cut at `max_results` like the real API.
+    """
+
+    def __init__(
+        self, base_url: str, targets: list, hits_per_query: int = 5, latency: float = 0.05, max_results: int = None
+    ):
+        self.base_url = base_url
+        self.index = {t["name"]: i for i, t in enumerate(targets)}
+        self.keywords = {t["name"]: t["keywords"][0] for t in targets}
+        self.hits_per_query = hits_per_query
+        self.latency = latency
+        self.max_results = max_results
+        self.calls = 0
+
+    async def ainvoke(self, params: dict):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        names = re.findall(r'"([^"]+)"', params["query"])
+        today = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        results = []
+        for j in range(self.hits_per_query):
+            for name in names:
+                i = self.index.get(name, 0)
+                results.append(
+                    {
+                        "url": f"{self.base_url}/article/{i * self.hits_per_query + j}?company={i}",
+                        "title": f"{name} announces update {j}",
+                        "content": f"News about {self.keywords.get(name, name.lower())}.",
+                        "score": 0.95 - 0.1 * j,
+                        "published_date": today,
+                    }
+                )
+        return {"query": params["query"], "results": results[: self.max_results]}
+
+
+class FakeStructuredLLM:
+    """
+    Stands in for `llm.with_structured_output(...)` with a configurable latency.
+    Produces ArticleSummary objects for the summarizer, Newsletter objects for the editor
+    (CompanySection / ExecutiveSummary for the map-reduce editor).
+    With `capacity`, calls beyond that many in flight are rejected with a 429 (`retry-after: 1`).
+    """
+
+    def __init__(self, schema, targets: list, latency: float = 0.2, capacity: int = 0):
+        self.schema = schema
+        self.names = [t["name"] for t in targets]
+        self.latency = latency
+        self.capacity = capacity
+        self.calls = 0
+        self.rejected = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def _respond(self, messages):
+        text = messages[-1].content if isinstance(messages[-1].content, str) else str(messages[-1].content)
+        return self.respond_to(text)
+
+    def respond_to(self, text: str):
+        self.calls += 1
+        if self.schema is ArticleSummary:
+            match = re.search(r"company=(\d+)", text)
+            company = self.names[int(match.group(1))] if match else "Industry"
+            return ArticleSummary(
+                title=f"{company} update",
+                key_points=["Released a 70B model.", "Raised $100M.", "CEO announced GA."],
+                relevance_score=7,
+                primary_company=company,
+            )
+
+        companies = [n for n in self.names if f"NEWS FOR {n.upper()}" in text]
+        if self.schema is CompanySection:
+            name = companies[0] if companies else "Industry"
+            return CompanySection(name=name, update=f"{name} shipped an update ([Example](https://example.com)). " * 2)
+        if self.schema is ExecutiveSummary:
+            return ExecutiveSummary(executive_summary=re.findall(r"### (.+?) ###", text))
+
+        sections = [
+            CompanySection(name=n, update=f"{n} shipped an update ([Example](https://example.com)). " * 2)
+            for n in companies
+        ]
+        return Newsletter(executive_summary=[f"{n} shipped." for n in companies], company_reports=sections)
+
+    def _rate_limit_error(self):
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        response = httpx.Response(429, headers={"retry-after": "1"}, request=request)
+        return anthropic.RateLimitError("fake rate limit", response=response, body=None)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        if self.capacity and self.active >= self.capacity:
+            self.rejected += 1
+            raise self._rate_limit_error()
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        return self._respond(messages)
+
+    def invoke(self, messages, *args, **kwargs):
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+
+class FakeBatchServer:
+    """
+    Threaded local HTTP server implementing the Anthropic Message Batches endpoints
+    (create / retrieve / results / cancel), for `anthropic.AsyncAnthropic(base_url=...)`.
+    Batches end `latency` seconds after creation; every `fail_every`-th item errors.
+    """
+
+    def __init__(self, responder: FakeStructuredLLM, latency: float = 1.0, fail_every: int = 0):
+        self.responder = responder
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self._batches = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self.base_url = None
+
+    def _batch_json(self, batch_id: str) -> dict:
+        batch = self._batches[batch_id]
+        ended = batch["canceled"] or time.monotonic() - batch["created"] >= self.latency
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": now,
+            "expires_at": now,
+            "ended_at": now if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": now if batch["canceled"] else None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _result_line(self, n: int, request: dict) -> dict:
+        if self.fail_every and (n + 1) % self.fail_every == 0:
+            error = {"type": "error", "error": {"type": "api_error", "message": "fake failure"}}
+            return {"custom_id": request["custom_id"], "result": {"type": "errored", "error": error}}
+        params = request["params"]
+        summary = self.responder.respond_to(params["messages"][-1]["content"])
+        message = {
+            "id": f"msg_{n}",
+            "type": "message",
+            "role": "assistant",
+            "model": params["model"],
+            "content": [
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{n}",
+                    "name": params["tools"][0]["name"],
+                    "input": summary.model_dump(),
+                }
+            ],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(params["messages"][-1]["content"]) // 4, "output_tokens": 120},
+        }
+        return {"custom_id": request["custom_id"], "result": {"type": "succeeded", "message": message}}
+
+    def start(self) -> str:
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    if self.path.rstrip("/").endswith("/v1/messages/batches"):
+                        batch_id = f"msgbatch_{len(fake._batches)}"
+                        fake._batches[batch_id] = {
+                            "requests": payload["requests"],
+                            "created": time.monotonic(),
+                            "canceled": False,
+                        }
+                        return self._send(200, json.dumps(fake._batch_json(batch_id)).encode())
+                    match = re.search(r"/v1/messages/batches/([^/]+)/cancel", self.path)
+                    if match and match.group(1) in fake._batches:
+                        fake._batches[match.group(1)]["canceled"] = True
+                        return self._send(200, json.dumps(fake._batch_json(match.group(1))).encode())
+                self._send(404, b"{}")
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                    match = re.search(r"/v1/messages/batches/([^/?]+)(/results)?", self.path)
+                    if not match or match.group(1) not in fake._batches:
+                        return self._send(404, b"{}")
+                    batch_id = match.group(1)
+                    if not match.group(2):
+                        return self._send(200, json.dumps(fake._batch_json(batch_id)).encode())
+                    lines = [
+                        json.dumps(fake._result_line(n, request))
+                        for n, request in enumerate(fake._batches[batch_id]["requests"])
+                    ]
+                self._send(200, "\n".join(lines).encode(), content_type="application/binary")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -1,41 +1,177 @@
+"""
+AI Newsletter Agent CLI.
+
+    python main.py                       # same as `run`
+    python main.py run [--resume RUN_ID]
+    python main.py search [--replay]     # dry run: search and selection only
+    python main.py render-only [--date YYYY-MM-DD]
+    python main.py resend-email [--date YYYY-MM-DD]
+
+Each command imports only what it needs, so the lightweight ones start instantly.
+"""
+
+import argparse
 import asyncio
 import datetime
+import uuid
 
-from app.agent.graph import workflow_app
-from app.services.email import send_email
 
-
-async def main():
-    print(
-        f"Starting AI Newsletter Agent ({datetime.datetime.now().strftime('%Y-%m-%d')})"
-    )
+async def run_workflow(run_id: str, resume: bool):
+    """
+    Runs the graph under a SQLite checkpointer (one thread per run id).
+    With `resume`, continues the saved run and only re-executes what is still missing.
+    """
+    from app.agent.graph import build_workflow
+    from app.config import CONFIG
+    from app.services.checkpoint import open_checkpointer
 
     # Initial State
     initial_state = {
         "search_results": [],
         "scraped_articles": [],
+        "unique_articles": [],
         "summaries": [],
         "seen_urls": [],
         "final_report": "",
+        "profile_reports": {},
         "steps": 0,
+        "search_since": None,
     }
+    config = {"configurable": {"thread_id": run_id}}
 
-    # Use 'ainvoke' instead of 'invoke' because summarize_node is async
-    final_state = await workflow_app.ainvoke(initial_state)
-    report = final_state.get("final_report", "No report generated.")
+    async with open_checkpointer() as checkpointer:
+        workflow_app = build_workflow(CONFIG["graph_mode"]).compile(checkpointer=checkpointer)
+
+        if resume:
+            snapshot = await workflow_app.aget_state(config)
+            if not snapshot.values:
+                raise SystemExit(f"No checkpoint found for run {run_id}.")
+            if not snapshot.next:
+                print(f"Run {run_id} already finished; reusing its report.")
+                return snapshot.values
+            print(f"Resuming run {run_id} at: {', '.join(snapshot.next)}")
+            initial_state = None
 
-    # Save locally
-    filename = f"output/AI_Newsletter_{datetime.datetime.now().strftime('%Y-%m-%d')}.md"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(report)
+        # 'sync' durability: each node's checkpoint is on disk before the next node starts
+        return await workflow_app.ainvoke(initial_state, config, durability="sync")
 
-    print(f"\n Report saved to: {filename}")
-    # Send via Email
+
+async def run(resume_run_id: str = None):
+    """Full pipeline: search -> scrape -> summarize -> edit, then save and email."""
+    from app.publish import publish, write_run_report
+    from app.services.browser import browser_pool
+    from app.services.checkpoint import run_progress
+    from app.services.extraction import extraction_executor
+    from app.services.fetcher import http_fetcher
+    from app.services.search import wait_for_revalidations
+    from app.telemetry import telemetry
+
+    print(
+        f"Starting AI Newsletter Agent ({datetime.datetime.now().strftime('%Y-%m-%d')})"
+    )
+    telemetry.reset()
+    run_progress.prune()
+
+    run_id = resume_run_id or f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    print(f"Run id: {run_id} (resume with: python main.py run --resume {run_id})")
+
+    # Use 'ainvoke' instead of 'invoke' because summarize_node is async
     try:
-        send_email(report)
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+        final_state = await run_workflow(run_id, resume=resume_run_id is not None)
+    finally:
+        # Stale search results were served from cache; let their refreshes land for the next run
+        await wait_for_revalidations()
+        # The browser pool, HTTP connection pool and extraction workers live for the whole run
+        await browser_pool.close()
+        await http_fetcher.close()
+        extraction_executor.close()
+    # The graph finished: its final state lives in the checkpoint, item progress is no longer needed
+    run_progress.clear(run_id)
+
+    filename = await publish(final_state)
+    write_run_report(filename)
+
+
+async def search(replay: bool = False):
+    """
+    Dry run of the Monitor: searches and prints the selected articles. Nothing is scraped or marked as seen.
+    With `replay`, only the latest recorded response per query is used (no API calls, any age or day);
+    dates are filtered as of when the responses were recorded.
+    """
+    from app.agent.nodes import monitor_news
+    from app.services.cache import search_cache
+    from app.services.search import wait_for_revalidations
+
+    search_cache.replay = replay
+    update = await monitor_news({"seen_urls": []})
+    await wait_for_revalidations()
+    for hit in update["search_results"]:
+        print(f"   [{hit.company}] {hit.score:.2f} {hit.date_display} | {hit.title}\n      {hit.url}")
+
+
+def render_only(date_str: str):
+    """Renders the saved Markdown report(s) of `date_str` to the HTML email body, without sending."""
+    from app.publish import saved_reports
+    from app.services.email import render_html
+
+    reports = saved_reports(date_str)
+    if not reports:
+        raise SystemExit(f"No saved report for {date_str}.")
+    for path, _ in reports:
+        with open(path, encoding="utf-8") as f:
+            html = render_html(f.read())
+        html_path = path.replace(".md", ".html")
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f" Rendered {path} -> {html_path}")
+
+
+async def resend_email(date_str: str):
+    """Emails the saved report(s) of `date_str` again, each to its recipients."""
+    from app.publish import saved_reports
+    from app.services.email import send_email
+
+    reports = saved_reports(date_str)
+    if not reports:
+        raise SystemExit(f"No saved report for {date_str}.")
+    for path, recipients in reports:
+        with open(path, encoding="utf-8") as f:
+            await send_email(f.read(), recipients)
+
+
+def parse_args(argv=None):
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    parser = argparse.ArgumentParser(description="AI Newsletter Agent")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="Run the full pipeline (default)")
+    run_parser.add_argument("--resume", metavar="RUN_ID", help="Continue an interrupted run from its checkpoint")
+    search_parser = commands.add_parser("search", help="Dry run: search and print the selected articles only")
+    search_parser.add_argument(
+        "--replay", action="store_true", help="Re-run the filtering on recorded search responses, without API calls"
+    )
+    for name, help_text in (
+        ("render-only", "Render a saved report to HTML without sending it"),
+        ("resend-email", "Email a saved report again"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--date", default=today, help="Report date, YYYY-MM-DD (default: today)")
+
+    parser.set_defaults(command="run", resume=None, replay=False)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "run":
+        asyncio.run(run(args.resume))
+    elif args.command == "search":
+        asyncio.run(search(args.replay))
+    elif args.command == "render-only":
+        render_only(args.date)
+    elif args.command == "resend-email":
+        asyncio.run(resend_email(args.date))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()